@@ -0,0 +1,29 @@
+"""posts added keyset pagination index
+
+Revision ID: 3f1c9a7e2b40
+Revises: 2325953a34f9
+Create Date: 2026-10-18 10:12:07.418293
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '3f1c9a7e2b40'
+down_revision: Union[str, None] = '2325953a34f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix__post__user_id__created__id',
+        'posts',
+        ['user_id', 'created', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix__post__user_id__created__id', table_name='posts')
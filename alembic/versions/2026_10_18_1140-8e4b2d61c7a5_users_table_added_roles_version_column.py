@@ -0,0 +1,33 @@
+"""users table: added roles_version column
+
+Revision ID: 8e4b2d61c7a5
+Revises: 3f1c9a7e2b40
+Create Date: 2026-10-18 11:40:52.106734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '8e4b2d61c7a5'
+down_revision: Union[str, None] = '3f1c9a7e2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column(
+            'roles_version',
+            sa.Integer(),
+            server_default='0',
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'roles_version')
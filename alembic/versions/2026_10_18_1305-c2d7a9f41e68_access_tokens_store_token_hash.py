@@ -0,0 +1,51 @@
+"""access_tokens: store token_hash instead of token
+
+Revision ID: c2d7a9f41e68
+Revises: 8e4b2d61c7a5
+Create Date: 2026-10-18 13:05:21.583019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'c2d7a9f41e68'
+down_revision: Union[str, None] = '8e4b2d61c7a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'access_tokens',
+        sa.Column('token_hash', sa.String(length=64), nullable=True),
+    )
+    op.execute(
+        "UPDATE access_tokens "
+        "SET token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex')"
+    )
+    op.alter_column('access_tokens', 'token_hash', nullable=False)
+    op.drop_constraint('access_tokens_pkey', 'access_tokens', type_='primary')
+    op.drop_column('access_tokens', 'token')
+    op.create_primary_key('access_tokens_pkey', 'access_tokens', ['token_hash'])
+    op.create_index(
+        op.f('ix_access_tokens_user_id'),
+        'access_tokens',
+        ['user_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    # Raw tokens can't be restored from hashes, users have to login again.
+    op.execute("DELETE FROM access_tokens")
+    op.drop_index(op.f('ix_access_tokens_user_id'), table_name='access_tokens')
+    op.drop_constraint('access_tokens_pkey', 'access_tokens', type_='primary')
+    op.drop_column('access_tokens', 'token_hash')
+    op.add_column(
+        'access_tokens',
+        sa.Column('token', sa.String(length=512), nullable=False),
+    )
+    op.create_primary_key('access_tokens_pkey', 'access_tokens', ['token'])
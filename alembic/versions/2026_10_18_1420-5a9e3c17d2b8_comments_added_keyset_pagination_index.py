@@ -0,0 +1,29 @@
+"""comments added keyset pagination index
+
+Revision ID: 5a9e3c17d2b8
+Revises: c2d7a9f41e68
+Create Date: 2026-10-18 14:20:43.290571
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = '5a9e3c17d2b8'
+down_revision: Union[str, None] = 'c2d7a9f41e68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix__comment__post_id__created__id',
+        'comments',
+        ['post_id', 'created', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix__comment__post_id__created__id', table_name='comments')
@@ -0,0 +1,45 @@
+"""added denormalized counters
+
+Revision ID: e71f0b4c9a23
+Revises: 5a9e3c17d2b8
+Create Date: 2026-10-18 15:30:11.674208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'e71f0b4c9a23'
+down_revision: Union[str, None] = '5a9e3c17d2b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COUNTERS = (
+    # (table, counter, related table, related column)
+    ('users', 'followers_count', 'follows', 'owner_id'),
+    ('users', 'posts_count', 'posts', 'user_id'),
+    ('sub_tiers', 'subscribers_count', 'subscriptions', 'sub_tier_id'),
+    ('posts', 'comments_count', 'comments', 'post_id'),
+)
+
+
+def upgrade() -> None:
+    for table, counter, related_table, related_column in COUNTERS:
+        op.add_column(
+            table,
+            sa.Column(counter, sa.Integer(), server_default='0', nullable=False),
+        )
+        op.execute(
+            f"UPDATE {table} SET {counter} = counts.count "
+            f"FROM (SELECT {related_column}, count(*) AS count "
+            f"FROM {related_table} GROUP BY {related_column}) AS counts "
+            f"WHERE {table}.id = counts.{related_column}"
+        )
+
+
+def downgrade() -> None:
+    for table, counter, _, _ in reversed(COUNTERS):
+        op.drop_column(table, counter)
@@ -0,0 +1,53 @@
+"""posts added search_vector
+
+Revision ID: 4b8d1e6f0c37
+Revises: e71f0b4c9a23
+Create Date: 2026-10-18 16:45:36.920415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = '4b8d1e6f0c37'
+down_revision: Union[str, None] = 'e71f0b4c9a23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Stored generated column rewrites the table.
+    op.add_column(
+        'posts',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', "
+                "coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('english', "
+                "coalesce(text, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix__post__search_vector',
+        'posts',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        'ix__post__search_vector',
+        table_name='posts',
+        postgresql_using='gin',
+    )
+    op.drop_column('posts', 'search_vector')
@@ -0,0 +1,28 @@
+"""sub_tiers added updated column
+
+Revision ID: 9d3f6a2c8e15
+Revises: 4b8d1e6f0c37
+Create Date: 2026-10-18 17:50:08.341927
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '9d3f6a2c8e15'
+down_revision: Union[str, None] = '4b8d1e6f0c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'sub_tiers',
+        sa.Column('updated', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('sub_tiers', 'updated')
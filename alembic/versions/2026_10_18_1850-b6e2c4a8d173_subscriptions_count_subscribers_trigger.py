@@ -0,0 +1,65 @@
+"""subscriptions count subscribers trigger
+
+Revision ID: b6e2c4a8d173
+Revises: 9d3f6a2c8e15
+Create Date: 2026-10-18 18:50:42.117603
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'b6e2c4a8d173'
+down_revision: Union[str, None] = '9d3f6a2c8e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Keeps `sub_tiers.subscribers_count` in the same statement,
+# which changes a subscription, so it can't drift.
+CREATE_FUNCTION = """
+CREATE FUNCTION subscriptions_count_subscribers() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.sub_tier_id IS NOT DISTINCT FROM NEW.sub_tier_id THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.sub_tier_id IS NOT NULL THEN
+        UPDATE sub_tiers SET subscribers_count = subscribers_count - 1
+        WHERE id = OLD.sub_tier_id;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') AND NEW.sub_tier_id IS NOT NULL THEN
+        UPDATE sub_tiers SET subscribers_count = subscribers_count + 1
+        WHERE id = NEW.sub_tier_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+CREATE_TRIGGER = """
+CREATE TRIGGER subscriptions_count_subscribers
+AFTER INSERT OR DELETE OR UPDATE OF sub_tier_id ON subscriptions
+FOR EACH ROW EXECUTE FUNCTION subscriptions_count_subscribers()
+"""
+
+RECOUNT = """
+UPDATE sub_tiers SET subscribers_count = (
+    SELECT count(*) FROM subscriptions
+    WHERE subscriptions.sub_tier_id = sub_tiers.id
+)
+"""
+
+
+def upgrade() -> None:
+    op.execute(CREATE_FUNCTION)
+    op.execute(CREATE_TRIGGER)
+    op.execute(RECOUNT)
+
+
+def downgrade() -> None:
+    op.execute(
+        'DROP TRIGGER subscriptions_count_subscribers ON subscriptions'
+    )
+    op.execute('DROP FUNCTION subscriptions_count_subscribers()')
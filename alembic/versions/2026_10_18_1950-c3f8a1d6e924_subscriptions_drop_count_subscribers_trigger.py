@@ -0,0 +1,57 @@
+"""subscriptions drop count subscribers trigger
+
+Revision ID: c3f8a1d6e924
+Revises: b6e2c4a8d173
+Create Date: 2026-10-18 19:50:17.482096
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = 'c3f8a1d6e924'
+down_revision: Union[str, None] = 'b6e2c4a8d173'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# `sub_tiers.subscribers_count` is maintained by `SubscriptionService`,
+# as the other denormalized counters.
+CREATE_FUNCTION = """
+CREATE FUNCTION subscriptions_count_subscribers() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.sub_tier_id IS NOT DISTINCT FROM NEW.sub_tier_id THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.sub_tier_id IS NOT NULL THEN
+        UPDATE sub_tiers SET subscribers_count = subscribers_count - 1
+        WHERE id = OLD.sub_tier_id;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') AND NEW.sub_tier_id IS NOT NULL THEN
+        UPDATE sub_tiers SET subscribers_count = subscribers_count + 1
+        WHERE id = NEW.sub_tier_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+CREATE_TRIGGER = """
+CREATE TRIGGER subscriptions_count_subscribers
+AFTER INSERT OR DELETE OR UPDATE OF sub_tier_id ON subscriptions
+FOR EACH ROW EXECUTE FUNCTION subscriptions_count_subscribers()
+"""
+
+
+def upgrade() -> None:
+    op.execute(
+        'DROP TRIGGER subscriptions_count_subscribers ON subscriptions'
+    )
+    op.execute('DROP FUNCTION subscriptions_count_subscribers()')
+
+
+def downgrade() -> None:
+    op.execute(CREATE_FUNCTION)
+    op.execute(CREATE_TRIGGER)
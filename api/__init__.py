@@ -7,6 +7,7 @@ from fastapi import APIRouter
 
 from .auth.routes import router as auth_router
 from .comments.routes import router as comment_router
+from .feeds.routes import router as feed_router
 from .follows. routes import router as follow_router
 from .posts.routes import router as post_router
 from .profiles.routes import router as profile_router
@@ -17,6 +18,7 @@ from .users.routes import router as user_router
 
 api_router = APIRouter()
 api_router.include_router(auth_router)
+api_router.include_router(feed_router)
 api_router.include_router(user_router)
 api_router.include_router(profile_router)
 api_router.include_router(sub_tier_router)
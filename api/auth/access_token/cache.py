@@ -0,0 +1,49 @@
+import time
+from collections import OrderedDict
+
+from core.settings import settings
+
+
+class TTLCache[V]:
+    """
+    Bounded in-process cache, where every item has its own
+    expiration time (unix timestamp).
+
+    Least recently used items are evicted when cache is full.
+    """
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._items: OrderedDict[str, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: str) -> V | None:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if time.time() >= expires_at:
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: V, expires_at: float) -> None:
+        if self.max_size <= 0 or time.time() >= expires_at:
+            return
+        self._items[key] = (expires_at, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._items.pop(key, None)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+verified_tokens: TTLCache[dict] = TTLCache(
+    max_size=settings.auth.jwt.verified_token_cache_size,
+)
+principals: TTLCache = TTLCache(
+    max_size=settings.auth.jwt.principal_cache_size,
+)
@@ -0,0 +1,103 @@
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.asymmetric.types import (
+    PrivateKeyTypes,
+    PublicKeyTypes,
+)
+from jwt.exceptions import InvalidTokenError
+
+from core.settings import JWTSettings, settings
+
+
+def get_algorithm(key: PrivateKeyTypes | PublicKeyTypes) -> str:
+    """
+    Get JWT algorithm for a key by its type.
+    """
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return "RS256"
+    if isinstance(
+        key,
+        (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey),
+    ):
+        return "ES256"
+    if isinstance(
+        key,
+        (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey),
+    ):
+        return "EdDSA"
+    raise ValueError(f"Unsupported key type: {type(key).__name__}")
+
+
+def load_private_key(path: Path) -> PrivateKeyTypes:
+    return serialization.load_pem_private_key(path.read_bytes(), password=None)
+
+
+def load_public_key(path: Path) -> PublicKeyTypes:
+    return serialization.load_pem_public_key(path.read_bytes())
+
+
+class KeyRing:
+    """
+    Signing key and verification keys (by key id), parsed once,
+    so PyJWT doesn't parse PEM on every sign/verify.
+
+    Tokens are signed with the current key and carry its `kid` header.
+    Public keys of previous key ids are kept to verify tokens issued
+    before rotation.
+    """
+    def __init__(
+        self,
+        key_id: str,
+        signing_key: PrivateKeyTypes,
+        verification_keys: dict[str, PublicKeyTypes],
+    ) -> None:
+        self.key_id = key_id
+        self.signing_key = signing_key
+        self.algorithm = get_algorithm(signing_key)
+        self.verification_keys = {
+            kid: (key, get_algorithm(key))
+            for kid, key in verification_keys.items()
+        }
+
+    def get_verification_key(
+        self,
+        key_id: str | None,
+    ) -> tuple[PublicKeyTypes, str]:
+        """
+        Get public key and its algorithm by key id
+        (tokens without `kid` are verified with the current key).
+
+        Raise `InvalidTokenError` if key id is unknown.
+        """
+        try:
+            return self.verification_keys[key_id or self.key_id]
+        except KeyError:
+            raise InvalidTokenError(f"Unknown key id: {key_id}")
+
+
+def load_key_ring(jwt_settings: JWTSettings) -> KeyRing:
+    """
+    Load keys from `jwt_settings`.
+
+    Raise `ValueError` if configured algorithm doesn't match the key.
+    """
+    signing_key = load_private_key(jwt_settings.private_key)
+    verification_keys = {
+        kid: load_public_key(path)
+        for kid, path in jwt_settings.previous_public_keys.items()
+    }
+    verification_keys[jwt_settings.key_id] = load_public_key(
+        jwt_settings.public_key,
+    )
+    key_ring = KeyRing(jwt_settings.key_id, signing_key, verification_keys)
+    if key_ring.algorithm != jwt_settings.algorithm:
+        raise ValueError(
+            f"JWT algorithm is {jwt_settings.algorithm}, "
+            f"but private key is for {key_ring.algorithm}."
+        )
+    return key_ring
+
+
+key_ring = load_key_ring(settings.auth.jwt)
@@ -1,3 +1,5 @@
+from sqlalchemy import delete, func, select
+
 from api.utils.repositories import CreateRepo, DeleteRepo
 from core.models import AccessToken
 
@@ -5,3 +7,23 @@ from core.models import AccessToken
 class AccessTokenRepo(CreateRepo[AccessToken],
                       DeleteRepo[AccessToken]):
     model = AccessToken
+
+    async def delete_expired(self, batch_size: int) -> int:
+        """
+        Delete up to `batch_size` expired tokens
+        and return the number of deleted ones.
+
+        Deleting in batches keeps every transaction (and its locks)
+        short, rows locked by concurrent requests are skipped.
+        """
+        expired = (
+            select(self.model.token_hash)
+            .where(self.model.expired < func.now())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(
+            delete(self.model).where(self.model.token_hash.in_(expired)),
+        )
+        await self._commit()
+        return result.rowcount
@@ -0,0 +1,182 @@
+import hashlib
+import logging
+import math
+import time
+from typing import Any
+
+from fastapi import HTTPException, status
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.redis import redis_client
+from core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter of strings.
+
+    Never gives false negatives, gives false positives with
+    `error_rate` probability while it holds up to `capacity` items.
+    """
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        self.capacity = capacity
+        self.size = max(
+            8,
+            math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2),
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [
+            (first + i * second) % self.size
+            for i in range(self.hash_count)
+        ]
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class RevokedTokens:
+    """
+    Revoked access tokens (by `jti` claim).
+
+    Redis holds a key per revoked token (until token expiration)
+    and a log of revocations (sorted set, scored by revocation time).
+    Every worker keeps a Bloom filter of revoked ids, synced from
+    the log incrementally at most once per `sync_interval`, so most
+    checks are an in-memory probe and only possible hits go to Redis.
+
+    ** WARNING **
+
+    Token revoked by another worker is accepted by this one
+    for up to `sync_interval` seconds.
+    """
+    TOKEN_KEY = "auth:revoked:{jti}"
+    LOG_KEY = "auth:revoked"
+    # Revocation time is set by the revoking worker's clock,
+    # sync re-reads some of the log to tolerate clock skew.
+    SYNC_OVERLAP_SECONDS = 5.0
+
+    def __init__(
+        self,
+        redis: Redis,
+        ttl: int,
+        capacity: int,
+        error_rate: float,
+        sync_interval: float,
+    ) -> None:
+        self.redis = redis
+        self.ttl = ttl
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._filter = BloomFilter(capacity, error_rate)
+        self._synced_until = 0.0
+        self._next_sync_at = 0.0
+
+    async def _sync(self) -> None:
+        now = time.monotonic()
+        if now < self._next_sync_at:
+            return
+        self._next_sync_at = now + self.sync_interval
+        if self._filter.count >= self.capacity:
+            # Bloom filter can't forget, rebuild it from the log,
+            # which holds only unexpired revocations.
+            self._filter = BloomFilter(self.capacity, self.error_rate)
+            self._synced_until = 0.0
+        try:
+            revoked = await self.redis.zrangebyscore(
+                self.LOG_KEY,
+                self._synced_until - self.SYNC_OVERLAP_SECONDS,
+                "+inf",
+                withscores=True,
+            )
+        except RedisError as error:
+            logger.warning("Revoked tokens are unavailable: %s", error)
+            return
+        for jti, revoked_at in revoked:
+            jti = jti.decode()
+            if jti not in self._filter:
+                self._filter.add(jti)
+            self._synced_until = max(self._synced_until, revoked_at)
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        """
+        Revoke token until its expiration time (unix timestamp).
+
+        Raise `http_503_service_unavailable` exception
+        if token can't be revoked.
+        """
+        ttl = math.ceil(expires_at - time.time())
+        if ttl <= 0:
+            return
+        now = time.time()
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(self.TOKEN_KEY.format(jti=jti), 1, ex=ttl)
+                pipe.zadd(self.LOG_KEY, {jti: now})
+                pipe.zremrangebyscore(self.LOG_KEY, "-inf", now - self.ttl)
+                await pipe.execute()
+        except RedisError as error:
+            logger.error("Token revocation failed: %s", error)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Please try again later.",
+            )
+        self._filter.add(jti)
+
+    async def is_revoked(self, jti: str) -> bool:
+        """
+        Check if token is revoked. Possible hits of Bloom filter
+        are treated as revoked, if Redis is unavailable.
+        """
+        await self._sync()
+        if jti not in self._filter:
+            return False
+        try:
+            key = self.TOKEN_KEY.format(jti=jti)
+            return bool(await self.redis.exists(key))
+        except RedisError as error:
+            logger.warning("Revoked tokens are unavailable: %s", error)
+            return True
+
+
+revoked_tokens = RevokedTokens(
+    redis=redis_client,
+    ttl=settings.auth.jwt.access_token_expire_minutes * 60,
+    capacity=settings.auth.jwt.revocation_filter_capacity,
+    error_rate=settings.auth.jwt.revocation_filter_error_rate,
+    sync_interval=settings.auth.jwt.revocation_sync_seconds,
+)
+
+
+async def ensure_not_revoked(validated_token: dict[str, Any]) -> None:
+    """
+    Raise `http_401_unauthorized` exception if access token is revoked.
+
+    Tokens without `jti` claim (issued before revocation support)
+    can't be revoked.
+    """
+    jti = validated_token.get("jti")
+    if jti is not None and await revoked_tokens.is_revoked(jti):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked!",
+        )
@@ -1,9 +1,14 @@
+import hashlib
+import secrets
 from datetime import datetime, timedelta, timezone
 from typing import Any, TYPE_CHECKING
 
 import jwt
 from fastapi import HTTPException, status
 
+from .cache import verified_tokens
+from .keys import key_ring
+from api.auth.roles import Role
 from core.settings import settings
 
 
@@ -13,8 +18,6 @@ if TYPE_CHECKING:
 
 def jwt_encode(
     payload: dict[str, Any],
-    private_key: str = settings.auth.jwt.private_key.read_text(),
-    algorithm: str = settings.auth.jwt.algorithm,
     expire_minutes: int = settings.auth.jwt.access_token_expire_minutes,
     expire_days: int | None = None,
 ) -> str:
@@ -28,16 +31,15 @@ def jwt_encode(
     to_encode.update(exp=expire)
     return jwt.encode(
         payload=to_encode,
-        key=private_key,
-        algorithm=algorithm,
+        key=key_ring.signing_key,
+        algorithm=key_ring.algorithm,
+        headers={"kid": key_ring.key_id},
     )
 
 
-def jwt_decode(
-    token: str,
-    public_key: str = settings.auth.jwt.public_key.read_text(),
-    algorithm: str = settings.auth.jwt.algorithm,
-) -> dict[str, Any]:
+def jwt_decode(token: str) -> dict[str, Any]:
+    key_id = jwt.get_unverified_header(token).get("kid")
+    public_key, algorithm = key_ring.get_verification_key(key_id)
     return jwt.decode(
         jwt=token,
         key=public_key,
@@ -63,7 +65,10 @@ def create_jwt_token(
 def create_access_token(user: "User") -> str:
     token_data = {
         "sub": user.username,
-        "id": user.id
+        "id": user.id,
+        "jti": secrets.token_urlsafe(16),
+        "roles": int(Role.from_user(user)),
+        "rv": user.roles_version,
     }
     return create_jwt_token(
         token_data=token_data,
@@ -73,14 +78,25 @@ def create_access_token(user: "User") -> str:
 
 
 def create_refresh_token(user: "User") -> str:
-    token_data = {"sub": user.username}
+    token_data = {
+        "sub": user.username,
+        "id": user.id,
+        "jti": secrets.token_urlsafe(16),
+    }
     return create_jwt_token(
         token_data=token_data,
         token_type="refresh",
-        expire_minutes=settings.auth.jwt.refresh_token_expire_days,
+        expire_days=settings.auth.jwt.refresh_token_expire_days,
     )
 
 
+def hash_token(token: str) -> str:
+    """
+    Get SHA-256 hexdigest of a token, which is stored instead of it.
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
 def create_reset_token(username: str) -> str:
     token_data = {"sub": username}
     return create_jwt_token(
@@ -100,13 +116,24 @@ def create_verification_token(username: str) -> str:
 
 
 def get_token_payload(token: str) -> dict[str, Any]:
+    """
+    Verify token and return its payload.
+
+    Verified payloads are cached until token expiration,
+    so signature is verified only once per token and worker.
+    """
+    payload = verified_tokens.get(token)
+    if payload is not None:
+        return payload
     try:
-        return jwt_decode(token)
+        payload = jwt_decode(token)
     except jwt.exceptions.InvalidTokenError as error:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid token! {error}",
         )
+    verified_tokens.set(token, payload, expires_at=payload["exp"])
+    return payload
 
 
 def validate_token(token: str, expected_type: str) -> dict[str, Any]:
@@ -0,0 +1,165 @@
+import base64
+import hashlib
+import hmac
+import os
+from abc import ABC, abstractmethod
+
+from core.settings import settings
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+
+class PasswordHasher(ABC):
+    """
+    Base password hasher.
+
+    Encoded hashes are `<algorithm>$<params...>$<salt>$<hash>`,
+    so hasher and its cost can be detected from the hash itself.
+
+    Hashing is CPU-bound and blocking, run it in
+    `api.auth.utils` executor, not on the event loop.
+    """
+    algorithm: str
+
+    @abstractmethod
+    def hash(self, password: str) -> str:
+        ...
+
+    @abstractmethod
+    def verify(self, encoded: str, password: str) -> bool:
+        ...
+
+    @abstractmethod
+    def needs_rehash(self, encoded: str) -> bool:
+        """
+        Check if hash was made by other hasher or with other cost.
+        """
+
+
+class ScryptHasher(PasswordHasher):
+    algorithm = "scrypt"
+
+    def __init__(self, n: int, r: int, p: int) -> None:
+        self.n = n
+        self.r = r
+        self.p = p
+
+    @staticmethod
+    def _derive(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+        return hashlib.scrypt(
+            password.encode("utf-8"),
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r * p,
+            dklen=64,
+        )
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(16)
+        derived = self._derive(password, salt, self.n, self.r, self.p)
+        return (
+            f"{self.algorithm}${self.n}${self.r}${self.p}"
+            f"${_b64encode(salt)}${_b64encode(derived)}"
+        )
+
+    def verify(self, encoded: str, password: str) -> bool:
+        _, n, r, p, salt, expected = encoded.split("$")
+        derived = self._derive(
+            password, _b64decode(salt), int(n), int(r), int(p),
+        )
+        return hmac.compare_digest(derived, _b64decode(expected))
+
+    def needs_rehash(self, encoded: str) -> bool:
+        return not encoded.startswith(
+            f"{self.algorithm}${self.n}${self.r}${self.p}$"
+        )
+
+
+class PBKDF2Hasher(PasswordHasher):
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations: int) -> None:
+        self.iterations = iterations
+
+    @staticmethod
+    def _derive(password: str, salt: bytes, iterations: int) -> bytes:
+        return hashlib.pbkdf2_hmac(
+            "sha256",
+            password.encode("utf-8"),
+            salt,
+            iterations,
+        )
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(16)
+        derived = self._derive(password, salt, self.iterations)
+        return (
+            f"{self.algorithm}${self.iterations}"
+            f"${_b64encode(salt)}${_b64encode(derived)}"
+        )
+
+    def verify(self, encoded: str, password: str) -> bool:
+        _, iterations, salt, expected = encoded.split("$")
+        derived = self._derive(password, _b64decode(salt), int(iterations))
+        return hmac.compare_digest(derived, _b64decode(expected))
+
+    def needs_rehash(self, encoded: str) -> bool:
+        return not encoded.startswith(f"{self.algorithm}${self.iterations}$")
+
+
+class LegacySHA512Hasher(PasswordHasher):
+    """
+    Salted SHA-512 hexdigest with the global `HASH_SALT`.
+
+    Only verifies existing hashes, which are upgraded on login.
+    """
+    algorithm = "sha512"
+
+    def hash(self, password: str) -> str:
+        encoded_password = (password + settings.auth.salt).encode("utf-8")
+        return hashlib.sha512(encoded_password).hexdigest()
+
+    def verify(self, encoded: str, password: str) -> bool:
+        return hmac.compare_digest(encoded, self.hash(password))
+
+    def needs_rehash(self, encoded: str) -> bool:
+        return True
+
+
+HASHERS: dict[str, PasswordHasher] = {
+    ScryptHasher.algorithm: ScryptHasher(
+        n=settings.auth.password.scrypt_n,
+        r=settings.auth.password.scrypt_r,
+        p=settings.auth.password.scrypt_p,
+    ),
+    PBKDF2Hasher.algorithm: PBKDF2Hasher(
+        iterations=settings.auth.password.pbkdf2_iterations,
+    ),
+}
+legacy_hasher = LegacySHA512Hasher()
+
+
+def get_hasher(encoded: str | None = None) -> PasswordHasher:
+    """
+    Get hasher, which made `encoded` hash,
+    or the configured one if `encoded` is not provided.
+
+    Raise `ValueError` if `encoded` was made by an unknown hasher.
+    """
+    if encoded is None:
+        return HASHERS[settings.auth.password.hasher]
+    algorithm, separator, _ = encoded.partition("$")
+    if not separator:
+        return legacy_hasher
+    try:
+        return HASHERS[algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown password hasher: {algorithm}") from None
@@ -1,31 +1,42 @@
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, Path, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 from .access_token import utils as token_utils
-from .services import AuthService
+from .access_token.revocation import ensure_not_revoked
+from .roles import ROLE_FIELDS, Role, roles_versions
 from api.users.repositories import UserRepo
-from api.users.services import GetUserWithObjId
+from api.users.services import GetObjOwnerId
+from core.database import PRIMARY_ONLY_KEY, db
 from core.settings import settings
 from core.models import User
 
 
 class Permissions:
     """
-    Get current session user and check if any of their roles
-    matches required ones.
+    Check if any of current session user's roles matches required ones.
 
-    - Return current session user on the first match.
+    Roles are taken from `roles` bitmask claim of `access_token`
+    and matched with a single bit operation, without database queries.
+    Roles are read from primary database instead, if:
+    - permission is `sensitive`;
+    - token was issued before user's roles changed
+      (its `rv` claim differs from current `User.roles_version`);
+    - token has no roles claims.
+
+    - Return current session user (transient, with `id`, `username`
+      and roles only) on match.
     - Raise `http_403_forbidden` exception, if there were no matches.
 
     Usage:
         Put into dependency with required permissions
-        (for roles info check `core.models.user: User`)
+        (for roles info check `api.auth.roles: Role`)
         ```
         @router.get(
             "/any",
-            dependencies=[Depends(Permissions("is_admin"))],
+            dependencies=[Depends(Permissions("is_admin", sensitive=True))],
         )
         async def get_any():
             ...
@@ -37,74 +48,117 @@ class Permissions:
             ...
         ```
     """
-    def __init__(self, *required_permissions: str) -> None:
-        self.required_permissions = required_permissions
+    def __init__(
+        self,
+        *required_permissions: str,
+        sensitive: bool = False,
+    ) -> None:
+        self.required_roles = Role.from_names(*required_permissions)
+        self.sensitive = sensitive
+
+    async def _get_roles_from_db(
+        self,
+        user_id: int,
+        user_repo: UserRepo,
+    ) -> Role:
+        # A replica may still have roles and version from before
+        # they were changed.
+        user_repo.session.info[PRIMARY_ONLY_KEY] = True
+        user = await user_repo.get_one(
+            filters={"id": user_id},
+            load_fields=[*ROLE_FIELDS, "roles_version"],
+        )
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User doesn't exist.",
+            )
+        await roles_versions.set(user.id, user.roles_version)
+        return Role.from_user(user)
 
-    def __call__(
+    async def __call__(
         self,
-        user: Annotated[User, Depends(AuthService.get_current_user)],
+        token: Annotated[str, Depends(settings.auth.oauth2_scheme)],
+        user_repo: Annotated[UserRepo, Depends(UserRepo)],
     ) -> User:
-        for permission in self.required_permissions:
-            if user.as_dict()[permission]:
-                return user
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You are not allowed to do this :("
+        validated_token = token_utils.validate_token(token, "access")
+        await ensure_not_revoked(validated_token)
+        user_id = validated_token.get("id")
+        db.bind_user(user_repo.session, user_id)
+        roles = None
+        if not self.sensitive and "roles" in validated_token:
+            roles_version = await roles_versions.get(user_id)
+            if roles_version == validated_token.get("rv"):
+                roles = Role(validated_token["roles"])
+        if roles is None:
+            roles = await self._get_roles_from_db(user_id, user_repo)
+        if not roles & self.required_roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You are not allowed to do this :("
+            )
+        return User(
+            id=user_id,
+            username=validated_token.get("sub"),
+            **roles.as_fields(),
         )
 
 
 class IsOwner:
     """
-    Get current session user with required object (`obj_name: obj_id`)
+    Check that current session user owns required object
+    (`obj_name: obj_id`).
 
-    - Return current session user if user is owner of required object.
+    Ownership is checked with a single `SELECT 1 ... WHERE id = :obj_id
+    AND user_id = :user_id`, using user id from `access_token`,
+    so neither user nor object is loaded.
+
+    - Return `obj_id` if user is owner of required object.
     - Raise `http_403_forbidden` exception, if user owns no objects with
       such parameters.
 
-    ** WARNING **
-        Using this class you no longer can use path parameter `{any_id}`
-        inside your route, since it is being used to get user
-        with required object. You can get access to it through `user` model:
-        ```
-        post_id = user.posts[0].id # for one-to-many relationship
-        profile_id = user.profile.id # for one-to-one relationship
-        ```
     Usage:
-        Put into dependency with the name of required object:
+        Put into dependency with the name of required object
+        (path parameter has to be named `{obj_id}`):
         ```
-        @router.get(
-            "/any",
+        @router.delete(
+            "/any/{obj_id}",
             dependencies=[Depends(IsOwner("post"))],
         )
-        async def get_any():
+        async def delete_any():
             ...
 
-        @router.get("/any")
-        async def get_any(
-            user: Annotated[User, Depends(IsOwner("comment"))],
+        @router.patch("/any/{obj_id}")
+        async def update_any(
+            comment_id: Annotated[int, Depends(IsOwner("comment"))],
         ):
             ...
         ```
     """
     def __init__(self, obj_name: str) -> None:
+        if obj_name not in GetObjOwnerId.REPOS_BY_OBJ_NAME:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
         self.obj_name = obj_name
 
     async def __call__(
         self,
         obj_id: Annotated[int, Path],
-        user_repo: Annotated[UserRepo, Depends(UserRepo)],
+        session: Annotated[AsyncSession, Depends(db.get_async_session)],
         token: Annotated[str, Depends(settings.auth.oauth2_scheme)],
-    ) -> User:
+    ) -> int:
         validated_token = token_utils.validate_token(token, "access")
-        try:
-            return await GetUserWithObjId(self.obj_name)(
-                username=validated_token.get("sub"),
-                obj_id=obj_id,
-                user_repo=user_repo,
-            )
-        except HTTPException:
+        await ensure_not_revoked(validated_token)
+        db.bind_user(session, validated_token.get("id"))
+        repo = GetObjOwnerId.REPOS_BY_OBJ_NAME[self.obj_name](session)
+        is_owner = await repo.exists(
+            filters={"id": obj_id, "user_id": validated_token.get("id")},
+        )
+        if not is_owner:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=("You are not allowed to do this :( "
                         "May be it has already been deleted though...")
             )
+        return obj_id
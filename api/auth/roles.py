@@ -0,0 +1,99 @@
+import logging
+from enum import IntFlag
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.models import User
+from core.redis import redis_client
+from core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class Role(IntFlag):
+    """
+    User roles (`core.models.user: User` flags) as a bitmask,
+    which is put into `access_token` as `roles` claim.
+    """
+    is_verified = 1
+    is_author = 2
+    is_admin = 4
+    is_superuser = 8
+
+    @classmethod
+    def from_names(cls, *names: str) -> "Role":
+        roles = cls(0)
+        for name in names:
+            roles |= cls[name]
+        return roles
+
+    @classmethod
+    def from_user(cls, user: User) -> "Role":
+        return cls.from_names(
+            *(role.name for role in cls if getattr(user, role.name)),
+        )
+
+    def as_fields(self) -> dict[str, bool]:
+        return {role.name: role in self for role in Role}
+
+
+ROLE_FIELDS = [role.name for role in Role]
+
+# KEYS[1] - roles version key.
+# ARGV[1] - roles version, ARGV[2] - ttl in seconds.
+# Return 1 if version was set, 0 if a newer one is already stored.
+SET_SCRIPT = """
+local current = tonumber(redis.call("GET", KEYS[1]))
+if current and current > tonumber(ARGV[1]) then
+    return 0
+end
+redis.call("SET", KEYS[1], ARGV[1], "EX", ARGV[2])
+return 1
+"""
+
+
+class RolesVersions:
+    """
+    Current `User.roles_version` of users in Redis, shared by all workers.
+
+    `access_token` carries roles version (`rv` claim) it was issued with,
+    so roles from claims are trusted only while versions are equal.
+    Versions are kept for access token lifetime, older tokens expire
+    anyway. Redis errors and misses are reported as unknown version.
+
+    Versions only grow: `set()` never replaces a newer version
+    with an older one (e.g. read before roles were revoked).
+    """
+    def __init__(self, redis: Redis, ttl: int) -> None:
+        self.redis = redis
+        self.ttl = ttl
+        self.set_script = redis.register_script(SET_SCRIPT)
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"users:roles_version:{user_id}"
+
+    async def get(self, user_id: int) -> int | None:
+        try:
+            version = await self.redis.get(self._key(user_id))
+        except RedisError as error:
+            logger.warning("Roles versions are unavailable: %s", error)
+            return None
+        return int(version) if version is not None else None
+
+    async def set(self, user_id: int, version: int) -> None:
+        try:
+            await self.set_script(
+                keys=[self._key(user_id)],
+                args=[version, self.ttl],
+            )
+        except RedisError as error:
+            logger.warning("Roles versions are unavailable: %s", error)
+
+
+roles_versions = RolesVersions(
+    redis=redis_client,
+    ttl=settings.auth.jwt.access_token_expire_minutes * 60,
+)
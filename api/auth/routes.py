@@ -11,6 +11,8 @@ from api.users.schemas import (
 )
 from api.auth.access_token.schemas import TokenInfo
 from api.profiles.services import ProfileService
+from api.utils.rate_limit import RateLimit
+from api.utils.unit_of_work import UnitOfWork
 from background_tasks import tasks
 from core.models import User
 from core.settings import settings
@@ -25,19 +27,23 @@ router = APIRouter(
 
 @router.post("/signup",
              response_model=UserResponse,
+             dependencies=[Depends(RateLimit("signup"))],
              status_code=status.HTTP_200_OK)
 async def signup(
     auth_service: Annotated[AuthService, Depends(AuthService)],
     profile_service: Annotated[ProfileService, Depends(ProfileService)],
+    uow: Annotated[UnitOfWork, Depends(UnitOfWork)],
     user_create: UserCreate,
 ) -> UserResponse:
-    user = await auth_service.create_user(user_create)
-    await profile_service.create_user_profile(user)
+    async with uow:
+        user = await auth_service.create_user(user_create)
+        await profile_service.create_user_profile(user)
     return user
 
 
 @router.post("/login",
              response_model=TokenInfo,
+             dependencies=[Depends(RateLimit("login"))],
              status_code=status.HTTP_200_OK)
 async def login(
     auth_service: Annotated[AuthService, Depends(AuthService)],
@@ -47,12 +53,24 @@ async def login(
     return TokenInfo(**tokens)
 
 
+@router.post("/refresh",
+             response_model=TokenInfo,
+             status_code=status.HTTP_200_OK)
+async def refresh(
+    auth_service: Annotated[AuthService, Depends(AuthService)],
+    refresh_token: str = Form(),
+) -> TokenInfo:
+    tokens = await auth_service.refresh_tokens(refresh_token)
+    return TokenInfo(**tokens)
+
+
 @router.post("/logout", status_code=status.HTTP_200_OK)
 async def logout(
     auth_service: Annotated[AuthService, Depends(AuthService)],
     current_user: Annotated[User, Depends(AuthService.get_current_user)],
+    token: Annotated[str, Depends(settings.auth.oauth2_scheme)],
 ) -> dict[str, str]:
-    await auth_service.delete_refresh_token(current_user)
+    await auth_service.logout(current_user, token)
     return {"message": "You've successfully logged out."}
 
 
@@ -71,7 +89,9 @@ async def change_password(
     return {"message": "Password has been changed!"}
 
 
-@router.post("/forgot-password", status_code=status.HTTP_200_OK)
+@router.post("/forgot-password",
+             dependencies=[Depends(RateLimit("forgot_password"))],
+             status_code=status.HTTP_200_OK)
 async def forgot_password(
     auth_service: Annotated[AuthService, Depends(AuthService)],
     username: str,
@@ -92,7 +112,9 @@ async def reset_password(
     return {"message": "Password has been changed!"}
 
 
-@router.post("/verificaion", status_code=status.HTTP_200_OK)
+@router.post("/verificaion",
+             dependencies=[Depends(RateLimit("verification"))],
+             status_code=status.HTTP_200_OK)
 async def send_verification_email(
     auth_service: Annotated[AuthService, Depends(AuthService)],
     current_user: Annotated["User", Depends(AuthService.get_current_user)],
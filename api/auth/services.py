@@ -1,13 +1,21 @@
+import time
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.exc import IntegrityError
 
 from . import utils as auth_utils
 from .access_token import utils as token_utils
+from .access_token.cache import principals
 from .access_token.repositories import AccessTokenRepo
+from .access_token.revocation import ensure_not_revoked, revoked_tokens
+from .roles import roles_versions
 from api.users import schemas as user_schemas
+from api.users.cache import user_cache
 from api.users.repositories import UserRepo
+from api.utils.unit_of_work import UnitOfWork
+from core.database import db
 from core.settings import settings
 from core.models import User
 
@@ -29,7 +37,9 @@ class AuthService:
         Raise `http_400_bad_request` exception if user with provided
         `username` or `email` already exists.
         """
-        user_dict = auth_utils.user_dict_hash_password(user.model_dump())
+        user_dict = await auth_utils.user_dict_hash_password(
+            user.model_dump(),
+        )
         try:
             return await self.user_repo.create(user_dict)
         except IntegrityError as error:
@@ -46,19 +56,31 @@ class AuthService:
         Get user by username and password (with token).
 
         Raise `http_401_unauthorized` exception if user doesn't exist.
+
+        Password hash made by an outdated hasher (or with an outdated
+        cost) is upgraded to the configured one on successful login.
         """
         valid_user = await self.user_repo.get_one(
             filters={"username": user.username},
-            related_o2o_models=[User.token],
         )
         if not (
             valid_user is not None
-            and auth_utils.is_password_same(valid_user.password, user.password)
+            and await auth_utils.is_password_same(
+                valid_user.password,
+                user.password,
+            )
         ):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid username or password!",
             )
+        if auth_utils.password_needs_rehash(valid_user.password):
+            await self.user_repo.update(
+                update_dict={
+                    "password": await auth_utils.hash_password(user.password),
+                },
+                filters={"id": valid_user.id},
+            )
         return valid_user
 
     async def get_access_and_refresh_tokens_for_user(
@@ -67,22 +89,67 @@ class AuthService:
     ) -> dict[str, str]:
         """
         Create and return `dict` with access and refresh tokens
-        for validated user. If refresh token already exists, return it instead.
-        Refresh token is stored in database.
+        for validated user.
 
         Raise `http_401_unauthorized` exception if user doesn't exist.
         """
         validated_user = await self.validate_auth_user(user)
+        return await self._create_tokens(validated_user)
+
+    async def _create_tokens(self, user: "User") -> dict[str, str]:
+        """
+        Create access and refresh tokens for a user.
+        Hash of refresh token is stored in database.
+        """
         tokens = {
-            "access_token": token_utils.create_access_token(validated_user),
-            "refresh_token": token_utils.create_refresh_token(validated_user),
+            "access_token": token_utils.create_access_token(user),
+            "refresh_token": token_utils.create_refresh_token(user),
         }
-        if validated_user.token is None:
-            await self.token_repo.create(
-                data_dict={
-                    "token": tokens["refresh_token"],
-                    "user_id": validated_user.id,
-                },
+        await self.token_repo.create(
+            data_dict={
+                "token_hash": token_utils.hash_token(tokens["refresh_token"]),
+                "user_id": user.id,
+            },
+        )
+        return tokens
+
+    async def refresh_tokens(self, refresh_token: str) -> dict[str, str]:
+        """
+        Rotate refresh token: delete the provided one and create
+        new access and refresh tokens, without password check.
+
+        Raise `http_401_unauthorized` exception if token is invalid,
+        or it isn't stored (already rotated or revoked). Rotated token
+        reuse means it's likely stolen, so all refresh tokens of the user
+        are revoked then.
+        """
+        validated_token = token_utils.validate_token(refresh_token, "refresh")
+        # Old token is deleted and new one is created atomically,
+        # so a failed rotation leaves the old token valid.
+        async with UnitOfWork(self.token_repo.session):
+            stored_token = await self.token_repo.delete(
+                filters={"token_hash": token_utils.hash_token(refresh_token)},
+                return_result=True,
+            )
+            if stored_token is not None:
+                user = await user_cache.get_or_load_by_username(
+                    validated_token.get("sub"),
+                    self.user_repo,
+                )
+                if user is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="User doesn't exist.",
+                    )
+                tokens = await self._create_tokens(user)
+        if stored_token is None:
+            if validated_token.get("id") is not None:
+                await self.token_repo.delete(
+                    filters={"user_id": validated_token.get("id")},
+                )
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token has been revoked!",
             )
         return tokens
 
@@ -99,13 +166,17 @@ class AuthService:
         Verify user by `verification_token`.
         """
         validated_token = token_utils.validate_token(token, "verification")
-        user = await self.user_repo.get_one(
+        user = await self.user_repo.update(
+            update_dict={
+                "is_verified": True,
+                "roles_version": User.roles_version + 1,
+            },
             filters={"username": validated_token.get("sub")},
+            return_result=True,
         )
-        await self.user_repo.update(
-            update_dict={"is_verified": True},
-            filters={"username": user.username}
-        )
+        if user is not None:
+            await user_cache.invalidate(user.id, user.username)
+            await roles_versions.set(user.id, user.roles_version)
 
     async def change_user_password(
         self,
@@ -120,18 +191,28 @@ class AuthService:
         and is different from the current one, or if new_password is the same
         as the current one.
         """
+        password_hash = user.password
+        if password_hash is None:
+            # Cached users don't have password hash.
+            password_hash = (await self.user_repo.get_one(
+                filters={"id": user.id},
+                load_fields=["password"],
+            )).password
         if old_password is not None:
-            if not auth_utils.is_password_same(user.password, old_password):
+            if not await auth_utils.is_password_same(
+                password_hash,
+                old_password,
+            ):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Invalid current password."
                 )
-        if auth_utils.is_password_same(user.password, new_password):
+        if await auth_utils.is_password_same(password_hash, new_password):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="New password has to be different from the old one."
             )
-        new_password_hashed = auth_utils.hash_password(new_password)
+        new_password_hashed = await auth_utils.hash_password(new_password)
         await self.user_repo.update(
             update_dict={"password": new_password_hashed},
             filters={"username": user.username},
@@ -145,6 +226,7 @@ class AuthService:
         """
         user = await self.user_repo.get_one(
             filters={"username": username},
+            load_fields=["username", "email"],
         )
         if user is None:
             raise HTTPException(
@@ -179,10 +261,15 @@ class AuthService:
             )
         await self.change_user_password(user, passwords.new_password)
 
-    async def delete_refresh_token(self, user: "User") -> None:
+    async def logout(self, user: "User", access_token: str) -> None:
         """
-        Delete user's refresh token.
+        Revoke provided access token and delete user's refresh tokens.
         """
+        validated_token = token_utils.validate_token(access_token, "access")
+        jti = validated_token.get("jti")
+        if jti is not None:
+            await revoked_tokens.revoke(jti, validated_token["exp"])
+        principals.delete(access_token)
         await self.token_repo.delete(
             filters={"user_id": user.id},
         )
@@ -203,10 +290,50 @@ class AuthService:
         only `authenticated` users will be allowed to use it.
         """
         validated_token = token_utils.validate_token(token, "access")
-        return await user_repo.get_one(
-            filters={"username": validated_token.get("sub")},
-            related_o2o_models=[User.profile],
+        await ensure_not_revoked(validated_token)
+        db.bind_user(user_repo.session, validated_token.get("id"))
+        user = principals.get(token)
+        if user is None:
+            user = await user_cache.get_or_load_by_username(
+                validated_token.get("sub"),
+                user_repo,
+            )
+            if user is not None:
+                principals.set(
+                    token,
+                    user,
+                    expires_at=min(
+                        validated_token["exp"],
+                        time.time()
+                        + settings.auth.jwt.principal_cache_ttl_seconds,
+                    ),
+                )
+        return user
+
+    @staticmethod
+    async def get_current_user_id_or_none(
+        credentials: Annotated[
+            HTTPAuthorizationCredentials | None,
+            Depends(settings.auth.transport),
+        ],
+    ) -> int | None:
+        """
+        ** Static method **
+
+        Get current session user id from `access_token` without
+        loading the user, or `None` for anonymous requests.
+
+        Raise `http_401_unauthorized` exception if provided token
+        is invalid.
+        """
+        if credentials is None:
+            return None
+        validated_token = token_utils.validate_token(
+            credentials.credentials,
+            "access",
         )
+        await ensure_not_revoked(validated_token)
+        return validated_token.get("id")
 
     @staticmethod
     async def get_user_by_reset_token(
@@ -1,22 +1,78 @@
-import hashlib
-from typing import Any
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
 
+from fastapi import HTTPException, status
+
+from .hashers import get_hasher
 from core.settings import settings
 
 
-def hash_password(password: str) -> str:
-    encoded_password = (password + settings.auth.salt).encode("utf-8")
-    return hashlib.sha512(encoded_password).hexdigest()
+logger = logging.getLogger(__name__)
+
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.auth.password.max_workers,
+    thread_name_prefix="password-hasher",
+)
+_pending_hashes = 0
+
+
+async def _run_in_executor[R](func: Callable[..., R], *args: Any) -> R:
+    """
+    Run blocking hash function in a bounded thread pool.
+
+    Raise `http_503_service_unavailable` exception if too many
+    hashes are already pending (e.g. login storm), instead of
+    queueing them without limit.
+    """
+    global _pending_hashes
+    if _pending_hashes >= settings.auth.password.max_pending:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy. Please try again later.",
+            headers={"Retry-After": "1"},
+        )
+    _pending_hashes += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _pending_hashes -= 1
 
 
-def user_dict_hash_password(user_dict: dict[str, Any]) -> dict[str, Any]:
-    hashed_password = hash_password(user_dict.get("password"))
+async def hash_password(password: str) -> str:
+    return await _run_in_executor(get_hasher().hash, password)
+
+
+async def user_dict_hash_password(
+    user_dict: dict[str, Any],
+) -> dict[str, Any]:
+    hashed_password = await hash_password(user_dict.get("password"))
     user_dict["password"] = hashed_password
     return user_dict
 
 
-def is_password_same(current: str, provided: str) -> bool:
-    return current == hash_password(provided)
+async def is_password_same(current: str, provided: str) -> bool:
+    """
+    Check `provided` password against `current` hash.
+
+    A hash made by an unknown hasher never matches.
+    """
+    try:
+        hasher = get_hasher(current)
+    except ValueError as error:
+        logger.warning("Password can't be verified: %s", error)
+        return False
+    return await _run_in_executor(
+        hasher.verify,
+        current,
+        provided,
+    )
+
+
+def password_needs_rehash(current: str) -> bool:
+    return get_hasher(current).needs_rehash(current)
 
 
 def get_verification_url(token: str) -> str:
@@ -1,14 +1,84 @@
+from typing import Any
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import aliased
+
 from api.utils.repositories import (
     CreateRepo,
+    ExistsRepo,
+    GetManyRepo,
+    GetOneRepo,
     UpdateRepo,
     DeleteRepo,
 )
 
-from core.models import Comment
+from core.models import Comment, Post
 
 
 class CommentRepo(CreateRepo[Comment],
+                  ExistsRepo[Comment],
+                  GetOneRepo[Comment],
+                  GetManyRepo[Comment],
                   UpdateRepo[Comment],
                   DeleteRepo[Comment]):
 
     model = Comment
+
+    async def update_with_post_author_id(
+        self,
+        update_dict: dict[str, Any],
+        filters: dict[str, Any],
+    ) -> tuple[Comment | None, int | None]:
+        """
+        Update comment and get it with id of its post's author
+        in one `UPDATE ... RETURNING` statement.
+        """
+        post_author_id = (
+            select(Post.user_id)
+            .filter(Post.id == Comment.post_id)
+            .scalar_subquery()
+        )
+        stmt = update(Comment).values(update_dict)
+        stmt = self._apply_filters(stmt, filters)
+        result = await self.session.execute(
+            stmt.returning(Comment, post_author_id),
+        )
+        row = result.one_or_none()
+        await self._commit()
+        return tuple(row) if row is not None else (None, None)
+
+    async def get_first_for_posts(
+        self,
+        post_ids: list[int],
+        per_post: int,
+    ) -> dict[int, list[Comment]]:
+        """
+        Get first `per_post` comments (ordered by `cursor_fields`)
+        of every post with one query, using a window function.
+
+        Return `{post_id: comments}`, posts without comments are missing.
+        """
+        if not post_ids:
+            return {}
+        order = [getattr(self.model, f) for f in self.cursor_fields]
+        ranked = (
+            select(
+                self.model,
+                func.row_number().over(
+                    partition_by=self.model.post_id,
+                    order_by=order,
+                ).label("position"),
+            )
+            .filter(self.model.post_id.in_(post_ids))
+            .subquery()
+        )
+        comment = aliased(self.model, ranked)
+        stmt = (
+            select(comment)
+            .filter(ranked.c.position <= per_post)
+            .order_by(ranked.c.post_id, ranked.c.position)
+        )
+        comments_by_post_id: dict[int, list[Comment]] = {}
+        for obj in await self.session.scalars(stmt):
+            comments_by_post_id.setdefault(obj.post_id, []).append(obj)
+        return comments_by_post_id
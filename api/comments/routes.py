@@ -1,12 +1,16 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Form, status
+from fastapi import APIRouter, Depends, Form, Path, status
 
 from .schemas import CommentCreate, CommentResponse, CommentUpdate
 from .services import CommentService
 from api.auth.permissions import IsOwner, Permissions
-from api.users.services import GetUserWithObjId
+from api.users.services import GetObjOwnerId
+from api.utils.pagination import PaginationParams
+from api.utils.rate_limit import RateLimit
+from api.utils.schemas import Page
 from core.models import User
+from core.query_stats import QueryBudget
 
 
 router = APIRouter(
@@ -16,17 +20,36 @@ router = APIRouter(
 
 @router.post("/{username}/posts/{obj_id}/comments",
              response_model=CommentResponse,
+             dependencies=[
+                 Depends(RateLimit("write")),
+                 Depends(GetObjOwnerId("post")),
+             ],
              status_code=status.HTTP_201_CREATED)
 async def create_comment(
     user: Annotated[User, Depends(Permissions("is_verified"))],
-    post_owner: Annotated[User, Depends(GetUserWithObjId("post"))],
     comment_service: Annotated[CommentService, Depends(CommentService)],
+    obj_id: Annotated[int, Path],
     comment: CommentCreate = Form(...),
 ) -> CommentResponse:
     return await comment_service.create_comment(
         user=user,
         comment=comment,
-        post_id=post_owner.posts[0].id,
+        post_id=obj_id,
+    )
+
+
+@router.get("/posts/{obj_id}/comments",
+            response_model=Page[CommentResponse],
+            dependencies=[Depends(QueryBudget(1))],
+            status_code=status.HTTP_200_OK)
+async def get_post_comments(
+    comment_service: Annotated[CommentService, Depends(CommentService)],
+    pagination: Annotated[PaginationParams, Depends(PaginationParams)],
+    obj_id: Annotated[int, Path],
+) -> Page[CommentResponse]:
+    return await comment_service.get_post_comments(
+        post_id=obj_id,
+        pagination=pagination,
     )
 
 
@@ -34,20 +57,20 @@ async def create_comment(
               response_model=CommentResponse,
               status_code=status.HTTP_200_OK)
 async def update_comment(
-    user: Annotated[User, Depends(IsOwner("comment"))],
+    comment_id: Annotated[int, Depends(IsOwner("comment"))],
     comment_service: Annotated[CommentService, Depends(CommentService)],
     comment_update: CommentUpdate = Form(...),
 ) -> CommentResponse:
     return await comment_service.update_comment(
         comment_update=comment_update,
-        comment_id=user.comments[0].id,
+        comment_id=comment_id,
     )
 
 
 @router.delete("/comments/{obj_id}",
                status_code=status.HTTP_204_NO_CONTENT)
 async def delete_comment(
-    user: Annotated[User, Depends(IsOwner("comment"))],
+    comment_id: Annotated[int, Depends(IsOwner("comment"))],
     comment_service: Annotated[CommentService, Depends(CommentService)],
 ) -> None:
-    await comment_service.delete_comment(comment_id=user.comments[0].id)
+    await comment_service.delete_comment(comment_id=comment_id)
@@ -4,16 +4,23 @@ from fastapi import Depends, HTTPException, status
 from sqlalchemy.exc import IntegrityError
 
 from .repositories import CommentRepo
-from .schemas import CommentCreate, CommentUpdate
+from .schemas import CommentCreate, CommentResponse, CommentUpdate
+from api.posts.repositories import PostRepo
+from api.utils.pagination import PaginationParams
+from api.utils.response_cache import response_cache
+from api.utils.schemas import fields_of
+from api.utils.unit_of_work import UnitOfWork
 from core.models import Comment, User
 
 
 class CommentService:
     def __init__(
         self,
-        comment_repo: Annotated[CommentRepo, Depends(CommentRepo)]
+        comment_repo: Annotated[CommentRepo, Depends(CommentRepo)],
+        post_repo: Annotated[PostRepo, Depends(PostRepo)],
     ) -> None:
         self.comment_repo = comment_repo
+        self.post_repo = post_repo
 
     async def create_comment(
         self,
@@ -25,23 +32,65 @@ class CommentService:
         comment_create_dict["user_id"] = user.id
         comment_create_dict["post_id"] = post_id
         try:
-            return await self.comment_repo.create(comment_create_dict)
+            async with UnitOfWork(self.comment_repo.session):
+                comment = await self.comment_repo.create(comment_create_dict)
+                post_author_id = await self.post_repo.increment(
+                    "comments_count",
+                    filters={"id": post_id},
+                    return_field="user_id",
+                )
         except IntegrityError:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Post with id={post_id} doesn't exist.",
             )
+        # Author's cached responses embed the post with first comments.
+        await response_cache.invalidate(post_author_id)
+        return comment
+
+    async def get_post_comments(
+        self,
+        post_id: int,
+        pagination: PaginationParams,
+    ) -> dict[str, list[Comment] | str | None]:
+        """
+        Get one page of post's comments ordered by creation time.
+        """
+        comments, next_cursor = await self.comment_repo.get_page(
+            limit=pagination.limit,
+            cursor=pagination.cursor,
+            filters={"post_id": post_id},
+            load_fields=fields_of(CommentResponse),
+        )
+        return {"items": comments, "next_cursor": next_cursor}
 
     async def update_comment(
         self,
         comment_update: CommentUpdate,
         comment_id: int,
     ) -> Comment:
-        return await self.comment_repo.update(
-            update_dict=comment_update.model_dump(),
-            filters={"id": comment_id},
-            return_result=True,
+        comment, post_author_id = (
+            await self.comment_repo.update_with_post_author_id(
+                update_dict=comment_update.model_dump(),
+                filters={"id": comment_id},
+            )
         )
+        if comment is not None:
+            await response_cache.invalidate(post_author_id)
+        return comment
 
     async def delete_comment(self, comment_id: int) -> None:
-        await self.comment_repo.delete(filters={"id": comment_id})
+        async with UnitOfWork(self.comment_repo.session):
+            comment = await self.comment_repo.delete(
+                filters={"id": comment_id},
+                return_result=True,
+            )
+            if comment is not None:
+                post_author_id = await self.post_repo.increment(
+                    "comments_count",
+                    filters={"id": comment.post_id},
+                    by=-1,
+                    return_field="user_id",
+                )
+        if comment is not None:
+            await response_cache.invalidate(post_author_id)
@@ -0,0 +1,145 @@
+import logging
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.redis import redis_client
+from core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class FeedCache:
+    """
+    Home feeds in Redis: a sorted set of post ids per user,
+    scored by post id (ids grow with creation time), so a page
+    is one `ZREVRANGEBYSCORE` below the previous page's last id.
+
+    Feeds are filled on write (fan-out), except posts of authors
+    with more than `settings.feed.fan_out_max_followers` followers:
+    those go to the author's own timeline, merged into feeds on read.
+
+    Feeds are capped at `max_length` posts.
+    Redis errors on read are logged and treated as empty feeds.
+    """
+    LARGE_AUTHORS_KEY = "feeds:large_authors"
+
+    def __init__(self, redis: Redis, max_length: int) -> None:
+        self.redis = redis
+        self.max_length = max_length
+
+    @staticmethod
+    def _feed_key(user_id: int) -> str:
+        return f"feeds:user:{user_id}"
+
+    @staticmethod
+    def _timeline_key(author_id: int) -> str:
+        return f"feeds:author:{author_id}"
+
+    @staticmethod
+    def _max_score(before_id: int | None) -> str:
+        return f"({before_id}" if before_id is not None else "+inf"
+
+    async def add_to_feeds(
+        self,
+        user_ids: list[int],
+        post_ids: list[int],
+    ) -> None:
+        """
+        Add posts to feeds of users with one pipeline.
+        """
+        if not user_ids or not post_ids:
+            return
+        mapping = {post_id: post_id for post_id in post_ids}
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                key = self._feed_key(user_id)
+                pipe.zadd(key, mapping)
+                pipe.zremrangebyrank(key, 0, -self.max_length - 1)
+            await pipe.execute()
+
+    async def remove_from_feed(
+        self,
+        user_id: int,
+        post_ids: list[int],
+    ) -> None:
+        if post_ids:
+            await self.redis.zrem(self._feed_key(user_id), *post_ids)
+
+    async def add_to_timeline(self, author_id: int, post_id: int) -> None:
+        """
+        Add post to the timeline of a large author (fan-out on read).
+        """
+        key = self._timeline_key(author_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.sadd(self.LARGE_AUTHORS_KEY, author_id)
+            pipe.zadd(key, {post_id: post_id})
+            pipe.zremrangebyrank(key, 0, -self.max_length - 1)
+            await pipe.execute()
+
+    async def get_feed(
+        self,
+        user_id: int,
+        limit: int,
+        before_id: int | None = None,
+    ) -> tuple[list[int], list[int]]:
+        """
+        Get up to `limit` post ids of user's feed older than `before_id`
+        and ids of large authors with one pipeline.
+        """
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.zrevrangebyscore(
+                    self._feed_key(user_id),
+                    self._max_score(before_id),
+                    "-inf",
+                    start=0,
+                    num=limit,
+                )
+                pipe.smembers(self.LARGE_AUTHORS_KEY)
+                post_ids, large_author_ids = await pipe.execute()
+        except RedisError as error:
+            logger.warning("Feeds are unavailable: %s", error)
+            return [], []
+        return (
+            [int(post_id) for post_id in post_ids],
+            [int(author_id) for author_id in large_author_ids],
+        )
+
+    async def get_timelines(
+        self,
+        author_ids: list[int],
+        limit: int,
+        before_id: int | None = None,
+    ) -> list[int]:
+        """
+        Get up to `limit` newest post ids older than `before_id`
+        from timelines of large authors with one pipeline.
+        """
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for author_id in author_ids:
+                    pipe.zrevrangebyscore(
+                        self._timeline_key(author_id),
+                        self._max_score(before_id),
+                        "-inf",
+                        start=0,
+                        num=limit,
+                    )
+                timelines = await pipe.execute()
+        except RedisError as error:
+            logger.warning("Feeds are unavailable: %s", error)
+            return []
+        post_ids = {
+            int(post_id)
+            for timeline in timelines
+            for post_id in timeline
+        }
+        return sorted(post_ids, reverse=True)[:limit]
+
+
+feed_cache = FeedCache(
+    redis=redis_client,
+    max_length=settings.feed.max_length,
+)
@@ -0,0 +1,30 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, status
+
+from .services import FeedService
+from api.auth.services import AuthService
+from api.posts.schemas import PostResponse
+from api.utils.pagination import PaginationParams
+from api.utils.schemas import Page
+from core.models import User
+from core.query_stats import QueryBudget
+
+
+router = APIRouter(
+    tags=["feed"],
+)
+
+
+# Worst case: user on `user_cache` miss, followed large authors
+# (only if feed has any), posts and their comments.
+@router.get("/feed",
+            response_model=Page[PostResponse],
+            dependencies=[Depends(QueryBudget(4))],
+            status_code=status.HTTP_200_OK)
+async def get_feed(
+    current_user: Annotated[User, Depends(AuthService.get_current_user)],
+    feed_service: Annotated[FeedService, Depends(FeedService)],
+    pagination: Annotated[PaginationParams, Depends(PaginationParams)],
+) -> Page[PostResponse]:
+    return await feed_service.get_feed(current_user.id, pagination)
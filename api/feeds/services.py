@@ -0,0 +1,66 @@
+from typing import Annotated
+
+from fastapi import Depends
+
+from .cache import feed_cache
+from api.follows.repositories import FollowRepo
+from api.posts.services import PostService
+from api.utils.pagination import (
+    decode_id_cursor,
+    encode_id_cursor,
+    PaginationParams,
+)
+from core.models import Post
+
+
+class FeedService:
+    def __init__(
+        self,
+        post_service: Annotated[PostService, Depends(PostService)],
+        follow_repo: Annotated[FollowRepo, Depends(FollowRepo)],
+    ) -> None:
+        self.post_service = post_service
+        self.follow_repo = follow_repo
+
+    async def get_feed(
+        self,
+        user_id: int,
+        pagination: PaginationParams,
+    ) -> dict[str, list[Post] | str | None]:
+        """
+        Get one page of user's home feed (posts of followed authors),
+        newest first.
+
+        Post ids come from one Redis pipeline (plus timelines of
+        followed large authors, if any), posts are fetched
+        with one batched query.
+        """
+        before_id = None
+        if pagination.cursor is not None:
+            before_id = decode_id_cursor(pagination.cursor)
+        limit = pagination.limit + 1
+        post_ids, large_author_ids = await feed_cache.get_feed(
+            user_id,
+            limit,
+            before_id,
+        )
+        followed_large_author_ids = await self.follow_repo.get_followed_ids(
+            user_id,
+            large_author_ids,
+        )
+        if followed_large_author_ids:
+            timeline_post_ids = await feed_cache.get_timelines(
+                followed_large_author_ids,
+                limit,
+                before_id,
+            )
+            post_ids = sorted(
+                {*post_ids, *timeline_post_ids},
+                reverse=True,
+            )[:limit]
+        next_cursor = None
+        if len(post_ids) > pagination.limit:
+            post_ids = post_ids[:pagination.limit]
+            next_cursor = encode_id_cursor(post_ids[-1])
+        posts = await self.post_service.get_posts_by_ids(post_ids)
+        return {"items": posts, "next_cursor": next_cursor}
@@ -1,7 +1,52 @@
-from api.utils.repositories import CreateRepo, DeleteRepo
+from typing import AsyncIterator
+
+from sqlalchemy import select
+
+from api.utils.repositories import (
+    CreateRepo,
+    DeleteRepo,
+    ExistsRepo,
+    UpsertRepo,
+)
 from core.models import Follow
 
 
 class FollowRepo(CreateRepo[Follow],
+                 ExistsRepo[Follow],
+                 UpsertRepo[Follow],
                  DeleteRepo[Follow]):
     model = Follow
+
+    async def stream_follower_ids(
+        self,
+        owner_id: int,
+        batch_size: int,
+    ) -> AsyncIterator[list[int]]:
+        """
+        Stream ids of users following `owner_id` in batches
+        through a server-side cursor.
+        """
+        stmt = (
+            select(self.model.client_id)
+            .filter(self.model.owner_id == owner_id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream_scalars(stmt)
+        async for batch in result.partitions(batch_size):
+            yield list(batch)
+
+    async def get_followed_ids(
+        self,
+        client_id: int,
+        owner_ids: list[int],
+    ) -> list[int]:
+        """
+        Get which of `owner_ids` are followed by `client_id`.
+        """
+        if not owner_ids:
+            return []
+        stmt = select(self.model.owner_id).filter(
+            self.model.client_id == client_id,
+            self.model.owner_id.in_(owner_ids),
+        )
+        return list(await self.session.scalars(stmt))
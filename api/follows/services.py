@@ -1,9 +1,12 @@
 from typing import Annotated
 
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.exc import IntegrityError
 
 from .repositories import FollowRepo
+from api.users.repositories import UserRepo
+from api.utils.response_cache import response_cache
+from api.utils.unit_of_work import UnitOfWork
+from background_tasks import tasks
 from core.models import Follow
 
 
@@ -11,27 +14,56 @@ class FollowService:
     def __init__(
         self,
         follow_repo: Annotated[FollowRepo, Depends(FollowRepo)],
+        user_repo: Annotated[UserRepo, Depends(UserRepo)],
     ) -> None:
         self.follow_repo = follow_repo
+        self.user_repo = user_repo
 
     async def create_followage(self, client_id: int, owner_id: int) -> Follow:
-        create_dict = {
-            "owner_id": owner_id,
-            "client_id": client_id,
-        }
-        try:
-            return await self.follow_repo.create(create_dict)
-        except IntegrityError as error:
-            orig_detail = error.__dict__["orig"]
-            error_field = str(orig_detail).split("\"")[3]
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Followage with {error_field} already exists!",
+        """
+        Create followage with a single
+        `INSERT ... ON CONFLICT DO NOTHING`
+        and increment owner's `followers_count`.
+
+        Raise `http_403_forbidden` exception if followage already exists.
+        """
+        async with UnitOfWork(self.follow_repo.session):
+            followage = await self.follow_repo.upsert(
+                data_dict={
+                    "owner_id": owner_id,
+                    "client_id": client_id,
+                },
+                conflict_fields=["owner_id", "client_id"],
+            )
+            if followage is None:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="You are already following this user.",
+                )
+            await self.user_repo.increment(
+                "followers_count",
+                filters={"id": owner_id},
             )
+        await response_cache.invalidate(owner_id)
+        tasks.backfill_feed.delay(client_id, owner_id)
+        return followage
 
     async def delete_followage(self, client_id: int, owner_id: int) -> None:
         delete_dict = {
             "owner_id": owner_id,
             "client_id": client_id,
         }
-        await self.follow_repo.delete(delete_dict)
+        async with UnitOfWork(self.follow_repo.session):
+            followage = await self.follow_repo.delete(
+                delete_dict,
+                return_result=True,
+            )
+            if followage is not None:
+                await self.user_repo.increment(
+                    "followers_count",
+                    filters={"id": owner_id},
+                    by=-1,
+                )
+        if followage is not None:
+            await response_cache.invalidate(owner_id)
+        tasks.prune_feed.delay(client_id, owner_id)
@@ -1,16 +1,132 @@
+from sqlalchemy import (
+    ColumnElement,
+    exists,
+    func,
+    or_,
+    Row,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import aliased
+
+from api.utils.pagination import decode_rank_cursor, encode_rank_cursor
 from api.utils.repositories import (
+    CounterRepo,
     CreateRepo,
+    ExistsRepo,
     GetManyRepo,
     GetOneRepo,
     UpdateRepo,
     DeleteRepo,
 )
-from core.models import Post
+from core.models import Comment, Post, Subscription, SubTier
+from core.models.post import SEARCH_CONFIG
 
 
-class PostRepo(CreateRepo[Post],
+class PostRepo(CounterRepo[Post],
+               CreateRepo[Post],
+               ExistsRepo[Post],
                GetOneRepo[Post],
                GetManyRepo[Post],
                UpdateRepo[Post],
                DeleteRepo[Post]):
     model = Post
+
+    @staticmethod
+    def _visible_to(viewer_id: int | None) -> ColumnElement[bool]:
+        """
+        Posts without tier are public. Tier posts are visible to their
+        author and to author's subscribers with a tier of the same
+        or higher price.
+        """
+        if viewer_id is None:
+            return Post.sub_tier_id.is_(None)
+        post_tier = aliased(SubTier)
+        viewer_tier = aliased(SubTier)
+        is_subscribed = exists(
+            select(Subscription.id)
+            .join(viewer_tier, Subscription.sub_tier_id == viewer_tier.id)
+            .join(post_tier, post_tier.id == Post.sub_tier_id)
+            .filter(
+                Subscription.owner_id == Post.user_id,
+                Subscription.sub_id == viewer_id,
+                viewer_tier.price >= post_tier.price,
+            )
+        )
+        return or_(
+            Post.sub_tier_id.is_(None),
+            Post.user_id == viewer_id,
+            is_subscribed,
+        )
+
+    async def search(
+        self,
+        query: str,
+        viewer_id: int | None,
+        limit: int,
+        cursor: str | None = None,
+        load_fields: list[str] | None = None,
+    ) -> tuple[list[Post], str | None]:
+        """
+        Full-text search over title and text (`websearch_to_tsquery`
+        syntax) through the GIN index on `Post.search_vector`,
+        ordered by `ts_rank` and keyset-paginated by `(rank, id)`.
+
+        Only posts visible to `viewer_id` (`None` for anonymous)
+        are returned.
+        """
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        rank = func.ts_rank(Post.search_vector, ts_query)
+        stmt = select(Post, rank.label("rank"))
+        stmt = self._apply_load_fields(stmt, load_fields)
+        stmt = stmt.filter(
+            Post.search_vector.bool_op("@@")(ts_query),
+            self._visible_to(viewer_id),
+        )
+        if cursor is not None:
+            stmt = stmt.filter(
+                tuple_(rank, Post.id) < tuple_(*decode_rank_cursor(cursor)),
+            )
+        stmt = stmt.order_by(rank.desc(), Post.id.desc()).limit(limit + 1)
+        rows = list(await self.session.execute(stmt))
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_post, last_rank = rows[-1]
+            next_cursor = encode_rank_cursor(last_rank, last_post.id)
+        return [post for post, _ in rows], next_cursor
+
+    async def get_version(
+        self,
+        post_id: int,
+        comments_preview: int,
+    ) -> Row | None:
+        """
+        Get version of the post with its first `comments_preview`
+        comments with one query over `Post` row and comments index,
+        without loading them: `(updated, sub_tier_id, comments_count,
+        comment ids, last comment update)`.
+        `sub_tier_id` is nulled by tier deletion,
+        which doesn't touch `updated`.
+
+        Return `None` if post doesn't exist.
+        """
+        preview = (
+            select(Comment.id, Comment.updated)
+            .filter(Comment.post_id == post_id)
+            .order_by(Comment.created, Comment.id)
+            .limit(comments_preview)
+            .subquery()
+        )
+        stmt = select(
+            Post.updated,
+            Post.sub_tier_id,
+            Post.comments_count,
+            select(
+                func.array_agg(aggregate_order_by(preview.c.id, preview.c.id)),
+            ).scalar_subquery(),
+            select(func.max(preview.c.updated)).scalar_subquery(),
+        ).filter(Post.id == post_id)
+        result = await self.session.execute(stmt)
+        return result.one_or_none()
@@ -1,21 +1,46 @@
+from functools import partial
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, Form, Path, UploadFile, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Path,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .schemas import PostCreate, PostResponse, PostUpdate, PostUpdateResponse
 from .services import PostService
 from api.auth.permissions import IsOwner, Permissions
-from api.users.services import GetUserWithObjId
+from api.auth.services import AuthService
+from api.users.services import GetObjOwnerId, UserService
+from api.utils.pagination import PaginationParams
+from api.utils.rate_limit import RateLimit
+from api.utils.response_cache import cached_json_response, response_cache
+from api.utils.schemas import Page
+from api.utils.streaming import StreamFormat, streaming_response
 from background_tasks.files.file_service import file_service
+from core.database import db
 from core.models.user import User
+from core.query_stats import QueryBudget
 
 router = APIRouter(
     tags=["posts"],
 )
+# One instance, so its result is shared by route dependencies
+# and parameters within a request.
+get_post_author_id = GetObjOwnerId("post")
 
 
 @router.post("/posts/",
              response_model=PostResponse,
+             dependencies=[Depends(RateLimit("write"))],
              status_code=status.HTTP_201_CREATED)
 async def create_post(
     user: Annotated[User, Depends(Permissions("is_author"))],
@@ -37,31 +62,94 @@ async def create_post(
     return await post_service.create_post(user, post_create)
 
 
+@router.get("/posts/search",
+            response_model=Page[PostResponse],
+            dependencies=[Depends(QueryBudget(2))],
+            status_code=status.HTTP_200_OK)
+async def search_posts(
+    post_service: Annotated[PostService, Depends(PostService)],
+    pagination: Annotated[PaginationParams, Depends(PaginationParams)],
+    viewer_id: Annotated[
+        int | None,
+        Depends(AuthService.get_current_user_id_or_none),
+    ],
+    q: Annotated[str, Query(min_length=1, max_length=256)],
+) -> Page[PostResponse]:
+    return await post_service.search_posts(q, viewer_id, pagination)
+
+
+@router.get("/{username}/posts/stream",
+            response_class=StreamingResponse,
+            status_code=status.HTTP_200_OK)
+async def stream_all_user_posts(
+    post_service: Annotated[PostService, Depends(PostService)],
+    username: Annotated[str, Path],
+    stream_format: Annotated[StreamFormat, Query()] = StreamFormat.ndjson,
+) -> StreamingResponse:
+    return streaming_response(
+        post_service.stream_user_posts_by_username(username),
+        schema=PostResponse,
+        stream_format=stream_format,
+    )
+
+
 @router.get("/{username}/posts/{obj_id}",
             response_model=PostResponse,
+            dependencies=[
+                Depends(QueryBudget(4)),
+                Depends(get_post_author_id),
+                Depends(PostService.check_post_version),
+            ],
             status_code=status.HTTP_200_OK)
 async def get_one_post(
+    response: Response,
+    session: Annotated[AsyncSession, Depends(db.get_async_session)],
     post_service: Annotated[PostService, Depends(PostService)],
-    post_owner: Annotated[User, Depends(GetUserWithObjId("post"))],
-) -> PostResponse:
-    return await post_service.get_post(post_id=post_owner.posts[0].id)
+    author_id: Annotated[int, Depends(get_post_author_id)],
+    obj_id: Annotated[int, Path],
+) -> Response:
+    body = await response_cache.get_or_build(
+        session=session,
+        name="post",
+        author_id=author_id,
+        params=(obj_id,),
+        response_model=PostResponse,
+        build=partial(post_service.get_post, post_id=obj_id),
+    )
+    return cached_json_response(body, response)
 
 
 @router.get("/{username}/posts",
-            response_model=list[PostResponse],
+            response_model=Page[PostResponse],
+            dependencies=[Depends(QueryBudget(3))],
             status_code=status.HTTP_200_OK)
 async def get_all_user_posts(
+    response: Response,
+    session: Annotated[AsyncSession, Depends(db.get_async_session)],
     post_service: Annotated[PostService, Depends(PostService)],
-    username: Annotated[str, Path],
-) -> list[PostResponse]:
-    return await post_service.get_user_posts_by_username(username)
+    pagination: Annotated[PaginationParams, Depends(PaginationParams)],
+    author: Annotated[User, Depends(UserService.get_user_by_username)],
+) -> Response:
+    body = await response_cache.get_or_build(
+        session=session,
+        name="posts",
+        author_id=author.id,
+        params=(pagination.limit, pagination.cursor),
+        response_model=Page[PostResponse],
+        build=partial(
+            post_service.get_user_posts_by_username,
+            author.username,
+            pagination,
+        ),
+    )
+    return cached_json_response(body, response)
 
 
 @router.patch("/posts/{obj_id}",
               response_model=PostUpdateResponse,
               status_code=status.HTTP_200_OK)
 async def update_post(
-    user: Annotated[User, Depends(IsOwner("post"))],
+    post_id: Annotated[int, Depends(IsOwner("post"))],
     post_service: Annotated[PostService, Depends(PostService)],
     title: str = Form(None),
     text: str = Form(None),
@@ -79,13 +167,13 @@ async def update_post(
     )
     return await post_service.update_post(
         post_update=post_update,
-        post_id=user.posts[0].id,
+        post_id=post_id,
     )
 
 
 @router.delete("/posts/{obj_id}")
 async def delete_post(
-    user: Annotated[User, Depends(IsOwner("post"))],
+    post_id: Annotated[int, Depends(IsOwner("post"))],
     post_service: Annotated[PostService, Depends(PostService)],
 ) -> None:
-    await post_service.delete_post(post_id=user.posts[0].id)
+    await post_service.delete_post(post_id=post_id)
@@ -28,7 +28,11 @@ class PostResponse(BaseModel):
     sub_tier_id: int | None = None
     created: datetime
     updated: datetime | None = None
-    comments: list[CommentResponse]
+    comments_count: int = 0
+    # First comments, the rest are paginated by `/posts/{id}/comments`
+    # starting from `comments_next_cursor`.
+    comments: list[CommentResponse] = []
+    comments_next_cursor: str | None = None
 
 
 class PostUpdateResponse(BaseModel):
@@ -1,20 +1,62 @@
-from typing import Annotated
+from typing import Annotated, AsyncIterator
 
-from fastapi import Depends, HTTPException, status
-from sqlalchemy import Sequence
+from fastapi import Depends, HTTPException, Path, Request, Response, status
+from sqlalchemy.orm.attributes import set_committed_value
 
 from .repositories import PostRepo
-from .schemas import PostCreate, PostUpdate
-from api.utils.schemas import PropertyFilter
+from .schemas import PostCreate, PostResponse, PostUpdate
+from api.comments.repositories import CommentRepo
+from api.users.repositories import UserRepo
+from api.utils.conditional import check_not_modified, make_etag
+from api.utils.pagination import encode_cursor, PaginationParams
+from api.utils.response_cache import response_cache
+from api.utils.schemas import fields_of, PropertyFilter
+from api.utils.unit_of_work import UnitOfWork
+from background_tasks import tasks
+from core.database import db
 from core.models import User, Post
+from core.settings import settings
 
 
 class PostService:
     def __init__(
         self,
         post_repo: Annotated[PostRepo, Depends(PostRepo)],
+        comment_repo: Annotated[CommentRepo, Depends(CommentRepo)],
+        user_repo: Annotated[UserRepo, Depends(UserRepo)],
     ) -> None:
         self.post_repo = post_repo
+        self.comment_repo = comment_repo
+        self.user_repo = user_repo
+
+    @staticmethod
+    async def _attach_comments(
+        posts: list[Post],
+        comment_repo: CommentRepo,
+    ) -> list[Post]:
+        """
+        Attach first comments (`settings.pagination.post_comments_preview`)
+        to posts with one query, instead of loading all comments.
+        `Post.comments_count` has to be loaded.
+        """
+        per_post = settings.pagination.post_comments_preview
+        comments_by_post_id = await comment_repo.get_first_for_posts(
+            [post.id for post in posts],
+            per_post,
+        )
+        for post in posts:
+            comments = comments_by_post_id.get(post.id, [])
+            set_committed_value(post, "comments", comments)
+            post.comments_next_cursor = None
+            if post.comments_count > len(comments):
+                post.comments_next_cursor = encode_cursor(
+                    comments[-1].created,
+                    comments[-1].id,
+                )
+        return posts
+
+    async def attach_comments(self, posts: list[Post]) -> list[Post]:
+        return await self._attach_comments(posts, self.comment_repo)
 
     async def create_post(self, user: User, post: PostCreate) -> Post:
         create_dict = dict()
@@ -22,50 +64,161 @@ class PostService:
             if post.model_dump()[key]:
                 create_dict[key] = value
         create_dict["user_id"] = user.id
-        return await self.post_repo.create(create_dict)
+        async with UnitOfWork(self.post_repo.session):
+            post = await self.post_repo.create(create_dict)
+            await self.user_repo.increment(
+                "posts_count",
+                filters={"id": user.id},
+            )
+        await response_cache.invalidate(user.id)
+        tasks.fan_out_post.delay(post.id, user.id)
+        set_committed_value(post, "comments", [])
+        return post
+
+    @staticmethod
+    async def check_post_version(
+        request: Request,
+        response: Response,
+        obj_id: Annotated[int, Path],
+        post_repo: Annotated[PostRepo, Depends(PostRepo)],
+    ) -> None:
+        """
+        Set `ETag` of the post made from its version.
+
+        Raise `http_304_not_modified` exception, if it matches
+        `If-None-Match`, before the post and its comments are loaded.
+        """
+        version = await post_repo.get_version(
+            post_id=obj_id,
+            comments_preview=settings.pagination.post_comments_preview,
+        )
+        if version is not None:
+            check_not_modified(request, response, make_etag(obj_id, *version))
 
     async def get_post(self, post_id: int) -> Post:
         post = await self.post_repo.get_one(
             filters={"id": post_id},
-            related_o2m_models=[Post.comments],
+            load_fields=fields_of(PostResponse),
         )
         if post is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=(f"Post with id={post_id} not found."),
             )
+        await self.attach_comments([post])
         return post
 
+    async def get_posts_by_ids(self, post_ids: list[int]) -> list[Post]:
+        """
+        Get posts with first comments by ids (in the same order),
+        missing ones are skipped.
+        """
+        posts = await self.post_repo.get_many_by_ids(
+            post_ids,
+            load_fields=fields_of(PostResponse),
+        )
+        return await self.attach_comments(posts)
+
     async def get_user_posts_by_username(
         self,
         username: str,
-    ) -> Sequence[Post]:
-        posts = await self.post_repo.get_many(
+        pagination: PaginationParams,
+    ) -> dict[str, list[Post] | str | None]:
+        """
+        Get one page of user's posts ordered by creation time.
+        """
+        posts, next_cursor = await self.post_repo.get_page(
+            limit=pagination.limit,
+            cursor=pagination.cursor,
             property_filter=PropertyFilter(
                 related_model=Post.user,
                 model_field=User.username,
                 field_value=username,
             ),
-            related_o2m_models=[Post.comments],
-            order_by="created",
+            load_fields=fields_of(PostResponse),
         )
-        if posts is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"User `{username}` not found.",
+        await self.attach_comments(posts)
+        return {"items": posts, "next_cursor": next_cursor}
+
+    async def search_posts(
+        self,
+        query: str,
+        viewer_id: int | None,
+        pagination: PaginationParams,
+    ) -> dict[str, list[Post] | str | None]:
+        """
+        Get one page of posts matching search `query`,
+        most relevant first.
+        """
+        posts, next_cursor = await self.post_repo.search(
+            query=query,
+            viewer_id=viewer_id,
+            limit=pagination.limit,
+            cursor=pagination.cursor,
+            load_fields=fields_of(PostResponse),
+        )
+        await self.attach_comments(posts)
+        return {"items": posts, "next_cursor": next_cursor}
+
+    async def stream_user_posts_by_username(
+        self,
+        username: str,
+    ) -> AsyncIterator[Post]:
+        """
+        Stream all user's posts ordered by creation time.
+
+        Uses its own session, since request session is closed
+        before `StreamingResponse` body is sent. Comments are attached
+        per `stream_yield_per` posts.
+        """
+        async with db.session_maker() as session:
+            post_repo = type(self.post_repo)(session)
+            comment_repo = type(self.comment_repo)(session)
+            posts = post_repo.stream_many(
+                property_filter=PropertyFilter(
+                    related_model=Post.user,
+                    model_field=User.username,
+                    field_value=username,
+                ),
+                load_fields=fields_of(PostResponse),
             )
-        return posts.all()
+            batch = []
+            async for post in posts:
+                batch.append(post)
+                if len(batch) == post_repo.stream_yield_per:
+                    await self._attach_comments(batch, comment_repo)
+                    for batch_post in batch:
+                        yield batch_post
+                    batch = []
+            await self._attach_comments(batch, comment_repo)
+            for batch_post in batch:
+                yield batch_post
 
     async def update_post(self, post_update: PostUpdate, post_id: int) -> Post:
         update_dict = dict()
         for key, value in post_update.model_dump().items():
             if post_update.model_dump()[key]:
                 update_dict[key] = value
-        return await self.post_repo.update(
+        post = await self.post_repo.update(
             update_dict=update_dict,
             filters={"id": post_id},
             return_result=True,
         )
+        if post is not None:
+            await response_cache.invalidate(post.user_id)
+        return post
 
     async def delete_post(self, post_id: int) -> None:
-        await self.post_repo.delete(filters={"id": post_id})
+        async with UnitOfWork(self.post_repo.session):
+            post = await self.post_repo.delete(
+                filters={"id": post_id},
+                return_result=True,
+            )
+            if post is not None:
+                await self.user_repo.increment(
+                    "posts_count",
+                    filters={"id": post.user_id},
+                    by=-1,
+                )
+        if post is not None:
+            await response_cache.invalidate(post.user_id)
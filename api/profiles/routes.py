@@ -1,11 +1,27 @@
+from functools import partial
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, Form, status, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Request,
+    Response,
+    status,
+    UploadFile,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from .schemas import ProfileResponse, ProfileUpdate
 from .services import ProfileService
 from api.auth.services import AuthService
+from api.users.services import UserService
+from api.utils.conditional import check_not_modified, make_etag
+from api.utils.response_cache import cached_json_response, response_cache
 # from background_tasks import tasks
 from background_tasks.files.file_service import file_service
+from core.database import db
 from core.models import User
 
 
@@ -19,10 +35,26 @@ router = APIRouter(
             response_model=ProfileResponse,
             status_code=status.HTTP_200_OK)
 async def get_user_profile(
+    request: Request,
+    response: Response,
+    session: Annotated[AsyncSession, Depends(db.get_async_session)],
     profile_service: Annotated[ProfileService, Depends(ProfileService)],
-    username: str,
-) -> ProfileResponse:
-    return await profile_service.get_user_profile_by_username(username)
+    author: Annotated[User, Depends(UserService.get_user_by_username)],
+) -> Response:
+    body = await response_cache.get_or_build(
+        session=session,
+        name="profile",
+        author_id=author.id,
+        params=(),
+        response_model=ProfileResponse,
+        build=partial(
+            profile_service.get_user_profile_by_username,
+            author.username,
+        ),
+    )
+    # Profile comes from caches, so its `ETag` is made from the body.
+    check_not_modified(request, response, make_etag(body))
+    return cached_json_response(body, response)
 
 
 @router.patch("/update",
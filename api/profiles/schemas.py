@@ -5,6 +5,8 @@ class ProfileResponse(BaseModel):
     first_name: str
     last_name: str | None = None
     bio: str | None = None
+    followers_count: int = 0
+    posts_count: int = 0
 
 
 class ProfileUpdate(BaseModel):
@@ -1,10 +1,12 @@
-from typing import Annotated
+from typing import Annotated, Any
 
 from fastapi import Depends, HTTPException, status
 
 from . import schemas
 from .repositories import ProfileRepo
+from api.users.cache import user_cache
 from api.users.repositories import UserRepo
+from api.utils.response_cache import response_cache
 from core.models import Profile, User
 
 
@@ -53,15 +55,26 @@ class ProfileService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Empty values. Nothing has changed."
             )
-        return await self.profile_repo.update(
+        profile = await self.profile_repo.update(
             update_dict=update_dict,
             filters={"user_id": user.id},
             return_result=True,
         )
+        await user_cache.invalidate(user.id, user.username)
+        await response_cache.invalidate(user.id)
+        return profile
 
-    async def get_user_profile_by_username(self, username: str) -> "Profile":
+    async def get_user_profile_by_username(
+        self,
+        username: str,
+    ) -> dict[str, Any]:
         """
-        Get user's profile by their username.
+        Get user's profile by their username,
+        with user's followers and posts counts.
+
+        Read from database with one query, not from `user_cache`:
+        counters change on every follow and post, and responses
+        are cached by `response_cache` anyway.
 
         Raise `http_404_not_found` exception,
         if user doesn't exist or doesn't have `is_author` status.
@@ -69,6 +82,7 @@ class ProfileService:
         user = await self.user_repo.get_one(
             filters={"username": username},
             related_o2o_models=[User.profile],
+            load_fields=["is_author", "followers_count", "posts_count"],
         )
         if user is None or not user.is_author:
             raise HTTPException(
@@ -76,4 +90,8 @@ class ProfileService:
                 detail=("Only verified users with `author` status "
                         "are allowed to have profile.")
             )
-        return user.profile
+        return {
+            **user.profile.as_dict(),
+            "followers_count": user.followers_count,
+            "posts_count": user.posts_count,
+        }
@@ -1,16 +1,45 @@
+from sqlalchemy import select
+
 from api.utils.repositories import (
+    CounterRepo,
     CreateRepo,
+    ExistsRepo,
     GetOneRepo,
     GetManyRepo,
     UpdateRepo,
     DeleteRepo,
 )
-from core.models import SubTier
+from core.models import SubTier, User
 
 
-class SubTierRepo(CreateRepo[SubTier],
+class SubTierRepo(CounterRepo[SubTier],
+                  CreateRepo[SubTier],
+                  ExistsRepo[SubTier],
                   GetOneRepo[SubTier],
                   GetManyRepo[SubTier],
                   UpdateRepo[SubTier],
                   DeleteRepo[SubTier]):
     model = SubTier
+
+    async def get_list_version(self, username: str) -> list[tuple] | None:
+        """
+        Get version of user's tiers list with one query, without
+        loading tiers: `(is_author, tier id, updated, subscribers_count)`
+        rows ordered by price.
+
+        Return `None` if user doesn't exist.
+        """
+        stmt = (
+            select(
+                User.is_author,
+                SubTier.id,
+                SubTier.updated,
+                SubTier.subscribers_count,
+            )
+            .select_from(User)
+            .outerjoin(User.sub_tiers)
+            .filter(User.username == username)
+            .order_by(SubTier.price)
+        )
+        rows = [tuple(row) for row in await self.session.execute(stmt)]
+        return rows or None
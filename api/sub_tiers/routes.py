@@ -1,11 +1,24 @@
+from functools import partial
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, File, Form, Path, status, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Response,
+    status,
+    UploadFile,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .services import SubTierService
 from .schemas import SubTierCreate, SubTierResponse, SubTierUpdate
 from api.auth.permissions import IsOwner, Permissions
+from api.users.services import UserService
+from api.utils.response_cache import cached_json_response, response_cache
 from background_tasks.files.file_service import file_service
+from core.database import db
 from core.models import User
 
 
@@ -40,19 +53,35 @@ async def create_sub_tier(
 
 @router.get("/{username}",
             response_model=list[SubTierResponse],
+            dependencies=[
+                Depends(SubTierService.check_sub_tier_list_version),
+            ],
             status_code=status.HTTP_200_OK)
 async def get_user_sub_tiers(
+    response: Response,
+    session: Annotated[AsyncSession, Depends(db.get_async_session)],
     sub_tier_service: Annotated[SubTierService, Depends(SubTierService)],
-    username: Annotated[str, Path],
-) -> list[SubTierResponse]:
-    return await sub_tier_service.get_sub_tier_list_by_username(username)
+    author: Annotated[User, Depends(UserService.get_user_by_username)],
+) -> Response:
+    body = await response_cache.get_or_build(
+        session=session,
+        name="sub_tiers",
+        author_id=author.id,
+        params=(),
+        response_model=list[SubTierResponse],
+        build=partial(
+            sub_tier_service.get_sub_tier_list_by_username,
+            author.username,
+        ),
+    )
+    return cached_json_response(body, response)
 
 
-@router.patch("/{sub_tier_id}",
+@router.patch("/{obj_id}",
               response_model=SubTierResponse,
               status_code=status.HTTP_200_OK)
 async def update_sub_tier(
-    user: Annotated[User, Depends(IsOwner("sub_tier"))],
+    sub_tier_id: Annotated[int, Depends(IsOwner("sub_tier"))],
     sub_tier_service: Annotated[SubTierService, Depends(SubTierService)],
     title: str | None = Form(None),
     text: str | None = Form(None),
@@ -70,14 +99,14 @@ async def update_sub_tier(
     )
     return await sub_tier_service.update_sub_tier(
         sub_tier_update=sub_tier_update,
-        sub_tier_id=user.sub_tiers[0].id
+        sub_tier_id=sub_tier_id,
     )
 
 
-@router.delete("/{sub_tier_id}",
+@router.delete("/{obj_id}",
                status_code=status.HTTP_204_NO_CONTENT)
 async def delete_sub_tier(
-    user: Annotated[User, Depends(IsOwner("sub_tier"))],
+    sub_tier_id: Annotated[int, Depends(IsOwner("sub_tier"))],
     sub_tier_service: Annotated[SubTierService, Depends(SubTierService)],
 ) -> None:
-    await sub_tier_service.delete_sub_tier(user.sub_tiers[0].id)
+    await sub_tier_service.delete_sub_tier(sub_tier_id)
@@ -21,3 +21,4 @@ class SubTierResponse(BaseModel):
     text: str
     price: int
     image_url: str | None = None
+    subscribers_count: int = 0
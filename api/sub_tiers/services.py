@@ -1,11 +1,13 @@
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Path, Request, Response, status
 from sqlalchemy.exc import IntegrityError
 
 from .repositories import SubTierRepo
 from .schemas import SubTierCreate, SubTierUpdate
 from api.users.repositories import UserRepo
+from api.utils.conditional import check_not_modified, make_etag
+from api.utils.response_cache import response_cache
 from core.models import SubTier, User
 
 
@@ -28,7 +30,7 @@ class SubTierService:
         if not sub_tier_dict["image_url"]:
             sub_tier_dict.pop("image_url")
         try:
-            return await self.sub_tier_repo.create(sub_tier_dict)
+            sub_tier = await self.sub_tier_repo.create(sub_tier_dict)
         except IntegrityError as error:
             orig_detail = error.__dict__["orig"]
             error_field = str(orig_detail).split("\"")[3]
@@ -36,6 +38,25 @@ class SubTierService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Subscription tier with {error_field} already exists!",
             )
+        await response_cache.invalidate(user.id)
+        return sub_tier
+
+    @staticmethod
+    async def check_sub_tier_list_version(
+        request: Request,
+        response: Response,
+        username: Annotated[str, Path],
+        sub_tier_repo: Annotated[SubTierRepo, Depends(SubTierRepo)],
+    ) -> None:
+        """
+        Set `ETag` of user's tiers list made from tiers versions.
+
+        Raise `http_304_not_modified` exception, if it matches
+        `If-None-Match`, before the tiers are loaded.
+        """
+        version = await sub_tier_repo.get_list_version(username)
+        if version is not None:
+            check_not_modified(request, response, make_etag(*version))
 
     async def get_sub_tier_list_by_username(
         self,
@@ -44,8 +65,9 @@ class SubTierService:
         user = await self.user_repo.get_one(
             filters={"username": username},
             related_o2m_models=[User.sub_tiers],
+            load_fields=["is_author"],
         )
-        if user.is_author:
+        if user is not None and user.is_author:
             return user.sub_tiers
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -61,11 +83,19 @@ class SubTierService:
         for key, value in sub_tier_update.model_dump().items():
             if sub_tier_update.model_dump()[key]:
                 update_dict[key] = value
-        return await self.sub_tier_repo.update(
+        sub_tier = await self.sub_tier_repo.update(
             update_dict=update_dict,
             filters={"id": sub_tier_id},
             return_result=True,
         )
+        if sub_tier is not None:
+            await response_cache.invalidate(sub_tier.user_id)
+        return sub_tier
 
     async def delete_sub_tier(self, sub_tier_id: int) -> None:
-        await self.sub_tier_repo.delete(filters={"id": sub_tier_id})
+        sub_tier = await self.sub_tier_repo.delete(
+            filters={"id": sub_tier_id},
+            return_result=True,
+        )
+        if sub_tier is not None:
+            await response_cache.invalidate(sub_tier.user_id)
@@ -1,14 +1,58 @@
+from typing import Any
+
+from sqlalchemy import or_, select, update
+
 from api.utils.repositories import (
     CreateRepo,
     DeleteRepo,
+    ExistsRepo,
     GetOneRepo,
     UpdateRepo,
+    UpsertRepo,
 )
 from core.models import Subscription
 
 
 class SubsciptionRepo(CreateRepo[Subscription],
+                      ExistsRepo[Subscription],
                       GetOneRepo[Subscription],
                       UpdateRepo[Subscription],
+                      UpsertRepo[Subscription],
                       DeleteRepo[Subscription]):
     model = Subscription
+
+    async def update_with_previous_tier_id(
+        self,
+        update_dict: dict[str, Any],
+        filters: dict[str, Any],
+        only_if_changed: bool = False,
+    ) -> tuple[Subscription | None, int | None]:
+        """
+        Update subscription and get it with its previous `sub_tier_id`
+        in one `UPDATE ... FROM (SELECT ... FOR UPDATE) ... RETURNING`
+        statement, so the row can't be changed in between.
+
+        - `only_if_changed` skips update, if values are the same.
+
+        Return `(None, None)` if nothing was updated.
+        """
+        previous = select(Subscription.id, Subscription.sub_tier_id)
+        previous = self._apply_filters(previous, filters)
+        previous = previous.with_for_update().subquery()
+        stmt = (
+            update(Subscription)
+            .filter(Subscription.id == previous.c.id)
+            .values(update_dict)
+        )
+        if only_if_changed:
+            stmt = stmt.filter(or_(*(
+                getattr(Subscription, field).is_distinct_from(value)
+                for field, value in update_dict.items()
+            )))
+        result = await self.session.execute(
+            stmt.returning(Subscription, previous.c.sub_tier_id),
+            execution_options={"populate_existing": True},
+        )
+        row = result.one_or_none()
+        await self._commit()
+        return tuple(row) if row is not None else (None, None)
@@ -1,11 +1,11 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Path, status
 
 from .schemas import SubscriptionResponse
 from .services import SubscriptionService
 from api.auth.services import AuthService
-from api.users.services import GetUserWithObjId
+from api.users.services import GetObjOwnerId
 from core.models.user import User
 
 
@@ -19,13 +19,14 @@ router = APIRouter(
              status_code=status.HTTP_200_OK)
 async def subscribe(
     current_user: Annotated[User, Depends(AuthService.get_current_user)],
-    sub_owner: Annotated[User, Depends(GetUserWithObjId("sub_tier"))],
+    sub_owner_id: Annotated[int, Depends(GetObjOwnerId("sub_tier"))],
     sub_service: Annotated[SubscriptionService, Depends(SubscriptionService)],
+    obj_id: Annotated[int, Path],
 ) -> SubscriptionResponse:
     return await sub_service.create_update_manager(
-        owner_id=sub_owner.id,
+        owner_id=sub_owner_id,
         client_id=current_user.id,
-        sub_tier_id=sub_owner.sub_tiers[0].id,
+        sub_tier_id=obj_id,
     )
 
 
@@ -34,11 +35,12 @@ async def subscribe(
              status_code=status.HTTP_200_OK)
 async def unsubscribe(
     current_user: Annotated[User, Depends(AuthService.get_current_user)],
-    sub_owner: Annotated[User, Depends(GetUserWithObjId("sub_tier"))],
+    sub_owner_id: Annotated[int, Depends(GetObjOwnerId("sub_tier"))],
     sub_service: Annotated[SubscriptionService, Depends(SubscriptionService)],
+    obj_id: Annotated[int, Path],
 ) -> SubscriptionResponse:
     return await sub_service.unsubscribe_from_current_tier(
-        owner_id=sub_owner.id,
+        owner_id=sub_owner_id,
         client_id=current_user.id,
-        sub_tier_id=sub_owner.sub_tiers[0].id,
+        sub_tier_id=obj_id,
     )
@@ -5,6 +5,9 @@ from sqlalchemy.exc import IntegrityError
 
 from . import utils
 from .repositories import SubsciptionRepo
+from api.sub_tiers.repositories import SubTierRepo
+from api.utils.response_cache import response_cache
+from api.utils.unit_of_work import UnitOfWork
 from core.models import Subscription
 
 
@@ -12,8 +15,32 @@ class SubscriptionService:
     def __init__(
         self,
         sub_repo: Annotated[SubsciptionRepo, Depends(SubsciptionRepo)],
+        sub_tier_repo: Annotated[SubTierRepo, Depends(SubTierRepo)],
     ) -> None:
         self.sub_repo = sub_repo
+        self.sub_tier_repo = sub_tier_repo
+
+    async def _move_subscriber(
+        self,
+        from_tier_id: int | None,
+        to_tier_id: int | None,
+    ) -> None:
+        """
+        Update `SubTier.subscribers_count` of both tiers.
+        """
+        if from_tier_id == to_tier_id:
+            return
+        if from_tier_id is not None:
+            await self.sub_tier_repo.increment(
+                "subscribers_count",
+                filters={"id": from_tier_id},
+                by=-1,
+            )
+        if to_tier_id is not None:
+            await self.sub_tier_repo.increment(
+                "subscribers_count",
+                filters={"id": to_tier_id},
+            )
 
     async def create_update_manager(
         self,
@@ -21,29 +48,49 @@ class SubscriptionService:
         client_id: int,
         sub_tier_id: int | None = None,
     ) -> Subscription:
+        """
+        Subscribe client to chosen tier, or change their current tier.
+
+        Current subscription is updated first (getting its previous
+        tier from the same statement), a new one is inserted only
+        if there is none. If it was inserted concurrently in between,
+        the update is retried, so tier counters stay exact.
+
+        Raise `http_403_forbidden` exception if client is already
+        subscribed to chosen tier.
+        """
         utils.client_is_not_sub_owner_or_403(client_id, owner_id)
-        subscription = await self.sub_repo.get_one(
-            filters={
-                "owner_id": owner_id,
-                "sub_id": client_id,
-            },
-        )
-        if subscription is not None:
-            if subscription.sub_tier_id != sub_tier_id:
-                return await self.change_subscription_tier(
-                    subscrption_id=subscription.id,
-                    sub_tier_id=sub_tier_id,
+        filters = {"owner_id": owner_id, "sub_id": client_id}
+        update_dict = {"sub_tier_id": sub_tier_id}
+        async with UnitOfWork(self.sub_repo.session):
+            subscription, previous_tier_id = (
+                await self.sub_repo.update_with_previous_tier_id(
+                    update_dict=update_dict,
+                    filters=filters,
+                    only_if_changed=True,
                 )
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You are already subscribed to chosen tier.",
-            )
-        else:
-            return await self.create_subscription(
-                owner_id=owner_id,
-                client_id=client_id,
-                sub_tier_id=sub_tier_id,
             )
+            if subscription is None:
+                subscription = await self.sub_repo.upsert(
+                    data_dict={**filters, **update_dict},
+                    conflict_fields=["owner_id", "sub_id"],
+                )
+            if subscription is None:
+                subscription, previous_tier_id = (
+                    await self.sub_repo.update_with_previous_tier_id(
+                        update_dict=update_dict,
+                        filters=filters,
+                        only_if_changed=True,
+                    )
+                )
+            if subscription is None:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="You are already subscribed to chosen tier.",
+                )
+            await self._move_subscriber(previous_tier_id, sub_tier_id)
+        await response_cache.invalidate(owner_id)
+        return subscription
 
     async def create_subscription(
         self,
@@ -57,7 +104,9 @@ class SubscriptionService:
             "sub_tier_id": sub_tier_id,
         }
         try:
-            return await self.sub_repo.create(create_dict)
+            async with UnitOfWork(self.sub_repo.session):
+                subscription = await self.sub_repo.create(create_dict)
+                await self._move_subscriber(None, sub_tier_id)
         except IntegrityError as error:
             orig_detail = error.__dict__["orig"]
             error_field = str(orig_detail).split("\"")[3]
@@ -65,17 +114,27 @@ class SubscriptionService:
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Subscription with {error_field} already exists!",
             )
+        if sub_tier_id is not None:
+            await response_cache.invalidate(owner_id)
+        return subscription
 
     async def change_subscription_tier(
         self,
         subscrption_id: int,
         sub_tier_id: int,
     ) -> Subscription | None:
-        return await self.sub_repo.update(
-            update_dict={"sub_tier_id": sub_tier_id},
-            filters={"id": subscrption_id},
-            return_result=True,
-        )
+        async with UnitOfWork(self.sub_repo.session):
+            subscription, previous_tier_id = (
+                await self.sub_repo.update_with_previous_tier_id(
+                    update_dict={"sub_tier_id": sub_tier_id},
+                    filters={"id": subscrption_id},
+                )
+            )
+            if subscription is not None:
+                await self._move_subscriber(previous_tier_id, sub_tier_id)
+        if subscription is not None:
+            await response_cache.invalidate(subscription.owner_id)
+        return subscription
 
     async def unsubscribe_from_current_tier(
         self,
@@ -84,18 +143,28 @@ class SubscriptionService:
         sub_tier_id: int,
     ) -> None:
         utils.client_is_not_sub_owner_or_403(client_id, owner_id)
-        subscription = await self.sub_repo.get_one(
+        async with UnitOfWork(self.sub_repo.session):
+            unsubscribed = await self.sub_repo.update(
+                update_dict={"sub_tier_id": None},
+                filters={
+                    "owner_id": owner_id,
+                    "sub_id": client_id,
+                    "sub_tier_id": sub_tier_id,
+                },
+                return_result=True,
+            )
+            if unsubscribed is not None:
+                await self._move_subscriber(sub_tier_id, None)
+        if unsubscribed is not None:
+            await response_cache.invalidate(owner_id)
+            return unsubscribed
+        is_subscribed = await self.sub_repo.exists(
             filters={
                 "owner_id": owner_id,
                 "sub_id": client_id,
             },
         )
-        if subscription:
-            if subscription.sub_tier_id == sub_tier_id:
-                return await self.change_subscription_tier(
-                    subscrption_id=subscription.id,
-                    sub_tier_id=None,
-                )
+        if is_subscribed:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="You are not subscribed to chosen tier."
@@ -106,4 +175,12 @@ class SubscriptionService:
         )
 
     async def delete_subsciption(self, subscrption_id: int) -> None:
-        await self.sub_repo.delete(filters={"id": subscrption_id})
+        async with UnitOfWork(self.sub_repo.session):
+            subscription = await self.sub_repo.delete(
+                filters={"id": subscrption_id},
+                return_result=True,
+            )
+            if subscription is not None:
+                await self._move_subscriber(subscription.sub_tier_id, None)
+        if subscription is not None:
+            await response_cache.invalidate(subscription.owner_id)
@@ -0,0 +1,117 @@
+import json
+import logging
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from .repositories import UserRepo
+from core.database import PRIMARY_ONLY_KEY
+from core.models import Profile, User
+from core.redis import redis_client
+from core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """
+    Redis cache of users with their profiles, shared by all workers
+    and keyed both by `id` and `username`.
+
+    Cached users are detached (transient) objects, they are good only
+    for reading. Password hash is never cached.
+    Redis errors are logged and treated as cache misses.
+
+    Every write to a user or their profile must call `invalidate()`.
+    """
+    def __init__(self, redis: Redis, ttl: int) -> None:
+        self.redis = redis
+        self.ttl = ttl
+
+    @staticmethod
+    def _id_key(user_id: int) -> str:
+        return f"users:id:{user_id}"
+
+    @staticmethod
+    def _username_key(username: str) -> str:
+        return f"users:username:{username}"
+
+    @staticmethod
+    def _dump(user: User) -> str:
+        user_dict = user.as_dict()
+        user_dict.pop("password")
+        user_dict["profile"] = user.profile.as_dict() if user.profile else None
+        return json.dumps(user_dict)
+
+    @staticmethod
+    def _load(raw: bytes) -> User:
+        user_dict: dict[str, Any] = json.loads(raw)
+        profile_dict = user_dict.pop("profile")
+        user = User(**user_dict)
+        user.profile = Profile(**profile_dict) if profile_dict else None
+        return user
+
+    async def _get(self, key: str) -> User | None:
+        try:
+            raw = await self.redis.get(key)
+        except RedisError as error:
+            logger.warning("User cache is unavailable: %s", error)
+            return None
+        return self._load(raw) if raw is not None else None
+
+    async def get_by_id(self, user_id: int) -> User | None:
+        return await self._get(self._id_key(user_id))
+
+    async def get_by_username(self, username: str) -> User | None:
+        return await self._get(self._username_key(username))
+
+    async def get_or_load_by_username(
+        self,
+        username: str,
+        user_repo: UserRepo,
+    ) -> User | None:
+        """
+        Get user with profile from cache, or from primary database
+        on miss (and cache it): a replica may not have replayed
+        the write, which invalidated the cached user, yet.
+        """
+        user = await self.get_by_username(username)
+        if user is None:
+            user_repo.session.info[PRIMARY_ONLY_KEY] = True
+            user = await user_repo.get_one(
+                filters={"username": username},
+                related_o2o_models=[User.profile],
+            )
+            if user is not None:
+                await self.set(user)
+        return user
+
+    async def set(self, user: User) -> None:
+        """
+        Cache user, `User.profile` has to be loaded.
+        """
+        raw = self._dump(user)
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(self._id_key(user.id), raw, ex=self.ttl)
+                pipe.set(self._username_key(user.username), raw, ex=self.ttl)
+                await pipe.execute()
+        except RedisError as error:
+            logger.warning("User cache is unavailable: %s", error)
+
+    async def invalidate(self, user_id: int, username: str) -> None:
+        try:
+            await self.redis.delete(
+                self._id_key(user_id),
+                self._username_key(username),
+            )
+        except RedisError as error:
+            logger.warning("User cache invalidation failed: %s", error)
+
+
+user_cache = UserCache(
+    redis=redis_client,
+    ttl=settings.redis.user_cache_ttl_seconds,
+)
@@ -1,4 +1,5 @@
 from api.utils.repositories import (
+    CounterRepo,
     CreateRepo,
     GetOneRepo,
     DeleteRepo,
@@ -7,7 +8,8 @@ from api.utils.repositories import (
 from core.models import User
 
 
-class UserRepo(CreateRepo[User],
+class UserRepo(CounterRepo[User],
+               CreateRepo[User],
                GetOneRepo[User],
                UpdateRepo[User],
                DeleteRepo[User]):
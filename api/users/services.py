@@ -2,12 +2,20 @@ from typing import Annotated
 
 from fastapi import Depends, HTTPException, Path, status
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from .cache import user_cache
 from .repositories import UserRepo
 from .schemas import UserCreate, UserUpdate
 from api.auth import utils as auth_utils
+from api.auth.roles import roles_versions
+from api.comments.repositories import CommentRepo
+from api.posts.repositories import PostRepo
+from api.sub_tiers.repositories import SubTierRepo
+from api.utils.response_cache import response_cache
 from api.utils.schemas import PropertyFilter
-from core.models import Comment, Post, SubTier, User
+from core.database import db
+from core.models import User
 
 
 class UserService:
@@ -26,7 +34,7 @@ class UserService:
         """
         user_dict = {
             "username": user.username,
-            "password": auth_utils.hash_password(user.password),
+            "password": await auth_utils.hash_password(user.password),
             "email": user.email,
             "is_verified": True,
             "is_admin": True,
@@ -56,11 +64,18 @@ class UserService:
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="User has to be verified."
             )
-        return await self.user_repo.update(
-            update_dict={"is_author": author_status},
+        updated_user = await self.user_repo.update(
+            update_dict={
+                "is_author": author_status,
+                "roles_version": User.roles_version + 1,
+            },
             filters={"username": user.username},
             return_result=True,
         )
+        await user_cache.invalidate(user.id, user.username)
+        await response_cache.invalidate(user.id)
+        await roles_versions.set(user.id, updated_user.roles_version)
+        return updated_user
 
     async def change_admin_status(
         self,
@@ -71,11 +86,17 @@ class UserService:
         Change change user's attribute `is_admin`,
         depending on `admin_status: bool` parameter.
         """
-        return await self.user_repo.update(
-            update_dict={"is_admin": admin_status},
+        updated_user = await self.user_repo.update(
+            update_dict={
+                "is_admin": admin_status,
+                "roles_version": User.roles_version + 1,
+            },
             filters={"username": user.username},
             return_result=True,
         )
+        await user_cache.invalidate(user.id, user.username)
+        await roles_versions.set(user.id, updated_user.roles_version)
+        return updated_user
 
     async def change_user_email(
         self,
@@ -94,7 +115,7 @@ class UserService:
                 detail="You already have this email.",
             )
         try:
-            return await self.user_repo.update(
+            updated_user = await self.user_repo.update(
                 update_dict=user_update.model_dump(exclude_unset=True),
                 filters={"username": user.username},
                 return_result=True,
@@ -106,21 +127,23 @@ class UserService:
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"User with {error_field} already exists!",
             )
+        await user_cache.invalidate(user.id, user.username)
+        return updated_user
 
     async def delete_user(self, user: User) -> None:
         """
         Delete user.
         """
         await self.user_repo.delete(filters={"username": user.username})
+        await user_cache.invalidate(user.id, user.username)
+        await response_cache.invalidate(user.id)
 
     @staticmethod
     async def get_user_by_username(
         username: Annotated[str, Path],
         user_repo: Annotated[UserRepo, Depends(UserRepo)],
     ) -> "User":
-        user = await user_repo.get_one(
-            filters={"username": username},
-        )
+        user = await user_cache.get_or_load_by_username(username, user_repo)
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -129,21 +152,24 @@ class UserService:
         return user
 
 
-class GetUserWithObjId:
-    RELATED_MODELS_BY_OBJ_NAME = {
-        "comment": User.comments,
-        "post": User.posts,
-        "sub_tier": User.sub_tiers,
-    }
+class GetObjOwnerId:
+    """
+    Get id of the user `username`, if they own `obj_name` with `obj_id`.
 
-    RELATED_MODELS_ID_BY_OBJ_NAME = {
-        "comment": Comment.id,
-        "post": Post.id,
-        "sub_tier": SubTier.id,
+    Runs one indexed query over the object table joined with users,
+    without loading the user or the object.
+
+    - Raise `http_404_not_found` exception, if user owns no objects
+      with such parameters.
+    """
+    REPOS_BY_OBJ_NAME = {
+        "comment": CommentRepo,
+        "post": PostRepo,
+        "sub_tier": SubTierRepo,
     }
 
     def __init__(self, obj_name: str) -> None:
-        if obj_name not in self.RELATED_MODELS_BY_OBJ_NAME:
+        if obj_name not in self.REPOS_BY_OBJ_NAME:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
@@ -153,18 +179,19 @@ class GetUserWithObjId:
         self,
         username: Annotated[str, Path],
         obj_id: Annotated[int, Path],
-        user_repo: Annotated[UserRepo, Depends(UserRepo)],
-    ) -> User | None:
-        user = await user_repo.get_one(
-            filters={"username": username},
+        session: Annotated[AsyncSession, Depends(db.get_async_session)],
+    ) -> int:
+        repo = self.REPOS_BY_OBJ_NAME[self.obj_name](session)
+        obj = await repo.get_one(
+            filters={"id": obj_id},
             property_filter=PropertyFilter(
-                related_model=self.RELATED_MODELS_BY_OBJ_NAME[self.obj_name],
-                model_field=self.RELATED_MODELS_ID_BY_OBJ_NAME[self.obj_name],
-                field_value=obj_id,
-                return_model=True,
-            )
+                related_model=repo.model.user,
+                model_field=User.username,
+                field_value=username,
+            ),
+            load_fields=["user_id"],
         )
-        if user is None:
+        if obj is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=(
@@ -172,4 +199,4 @@ class GetUserWithObjId:
                     f"{self.obj_name} with id={obj_id}."
                 ),
             )
-        return user
+        return obj.user_id
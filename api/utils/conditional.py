@@ -0,0 +1,52 @@
+import hashlib
+from typing import Any
+
+from fastapi import HTTPException, Request, Response, status
+
+
+def make_etag(*version: Any) -> str:
+    """
+    Make weak entity tag from resource version (row timestamps,
+    counters, ids of related rows), not from the response body,
+    so it can be checked before the resource is loaded.
+    """
+    digest = hashlib.blake2b(
+        repr(version).encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Weak comparison of `etag` with `If-None-Match` header value.
+    """
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque_tag
+        for tag in if_none_match.split(",")
+    )
+
+
+def check_not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+) -> None:
+    """
+    Set `ETag` header of the response.
+
+    Raise `http_304_not_modified` exception (without body),
+    if `If-None-Match` header of the request matches `etag`.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=headers,
+        )
+    response.headers.update(headers)
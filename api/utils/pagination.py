@@ -0,0 +1,112 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Annotated
+
+from fastapi import HTTPException, Query, status
+
+from core.settings import settings
+
+
+def encode_cursor(created: datetime, obj_id: int) -> str:
+    """
+    Encode `(created, id)` of the last returned row into an opaque cursor.
+    """
+    raw = json.dumps([created.isoformat(), obj_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode opaque cursor back into `(created, id)`.
+
+    Raise `http_400_bad_request` exception if cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        created, obj_id = json.loads(raw)
+        return datetime.fromisoformat(created), int(obj_id)
+    except (binascii.Error, UnicodeError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor.",
+        )
+
+
+def encode_id_cursor(obj_id: int) -> str:
+    """
+    Encode id of the last returned object into an opaque cursor,
+    for feeds ordered by id only.
+    """
+    raw = str(obj_id).encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_id_cursor(cursor: str) -> int:
+    """
+    Decode opaque cursor back into id.
+
+    Raise `http_400_bad_request` exception if cursor is malformed.
+    """
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor.",
+        )
+
+
+def encode_rank_cursor(rank: float, obj_id: int) -> str:
+    """
+    Encode `(rank, id)` of the last returned row into an opaque cursor,
+    for results ordered by relevance.
+    """
+    raw = json.dumps([rank, obj_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    """
+    Decode opaque cursor back into `(rank, id)`.
+
+    Raise `http_400_bad_request` exception if cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        rank, obj_id = json.loads(raw)
+        return float(rank), int(obj_id)
+    except (binascii.Error, UnicodeError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor.",
+        )
+
+
+class PaginationParams:
+    """
+    Query parameters for keyset (cursor) pagination.
+
+    - `cursor` is taken from `next_cursor` of the previous page.
+    - `limit` is bounded by `settings.pagination.max_limit`.
+
+    Usage:
+        ```
+        @router.get("/any")
+        async def get_any(
+            pagination: Annotated[PaginationParams, Depends(PaginationParams)],
+        ):
+            ...
+        ```
+    """
+    def __init__(
+        self,
+        cursor: Annotated[str | None, Query()] = None,
+        limit: Annotated[
+            int,
+            Query(ge=1, le=settings.pagination.max_limit),
+        ] = settings.pagination.default_limit,
+    ) -> None:
+        self.cursor = cursor
+        self.limit = limit
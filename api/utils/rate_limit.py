@@ -0,0 +1,183 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from api.auth.access_token import utils as token_utils
+from core.redis import redis_client
+from core.settings import RateLimitRule, settings
+
+
+logger = logging.getLogger(__name__)
+
+
+# KEYS[1] - bucket key.
+# ARGV[1] - capacity, ARGV[2] - refill rate (tokens per second).
+# Return `{allowed (0 or 1), seconds until the next token}`.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call("TIME")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = math.ceil((1 - tokens) / rate)
+end
+redis.call(
+    "HSET", KEYS[1], "tokens", tostring(tokens), "updated", tostring(now)
+)
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, retry_after}
+"""
+
+
+class LocalTokenBuckets:
+    """
+    In-process token buckets, used when Redis is unavailable.
+
+    Limits are per worker then, so they are looser
+    than configured ones.
+    """
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take(self, key: str, capacity: int, rate: float) -> int:
+        """
+        Take a token from the bucket `key`.
+        Return 0 if allowed, or seconds until the next token.
+        """
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        retry_after = 0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = math.ceil((1 - tokens) / rate)
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_size:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class TokenBuckets:
+    """
+    Token buckets in Redis, shared by all workers. Every check
+    is a single atomic Lua script call.
+    """
+    def __init__(self, redis: Redis, fallback: LocalTokenBuckets) -> None:
+        self.redis = redis
+        self.script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+        self.fallback = fallback
+
+    async def take(self, key: str, capacity: int, rate: float) -> int:
+        """
+        Take a token from the bucket `key`.
+        Return 0 if allowed, or seconds until the next token.
+        """
+        try:
+            allowed, retry_after = await self.script(
+                keys=[key],
+                args=[capacity, rate],
+            )
+        except RedisError as error:
+            logger.warning("Rate limiter falls back to local: %s", error)
+            return self.fallback.take(key, capacity, rate)
+        return 0 if allowed else max(1, int(retry_after))
+
+
+token_buckets = TokenBuckets(
+    redis=redis_client,
+    fallback=LocalTokenBuckets(settings.rate_limit.fallback_max_keys),
+)
+
+
+class RateLimit:
+    """
+    Limit request rate with a token bucket per client
+    (`settings.rate_limit.rules[rule_name]`).
+
+    Clients are identified by user id from a valid `access_token`
+    for rules `by="user"` (falling back to IP address),
+    or by IP address.
+
+    - Raise `http_429_too_many_requests` exception with
+      `Retry-After` header, if bucket is empty.
+
+    Usage:
+        ```
+        @router.post(
+            "/any",
+            dependencies=[Depends(RateLimit("login"))],
+        )
+        async def post_any():
+            ...
+        ```
+    """
+    def __init__(self, rule_name: str) -> None:
+        if rule_name not in settings.rate_limit.rules:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        self.rule_name = rule_name
+
+    @staticmethod
+    def _get_client_key(
+        rule: RateLimitRule,
+        request: Request,
+        credentials: HTTPAuthorizationCredentials | None,
+    ) -> str:
+        if rule.by == "user" and credentials is not None:
+            try:
+                payload = token_utils.get_token_payload(
+                    credentials.credentials,
+                )
+            except HTTPException:
+                pass
+            else:
+                if payload.get("id") is not None:
+                    return f"user:{payload['id']}"
+        host = request.client.host if request.client else "unknown"
+        return f"ip:{host}"
+
+    async def __call__(
+        self,
+        request: Request,
+        credentials: Annotated[
+            HTTPAuthorizationCredentials | None,
+            Depends(settings.auth.transport),
+        ],
+    ) -> None:
+        if not settings.rate_limit.enabled:
+            return
+        rule = settings.rate_limit.rules[self.rule_name]
+        client_key = self._get_client_key(rule, request, credentials)
+        retry_after = await token_buckets.take(
+            key=f"rate_limit:{self.rule_name}:{client_key}",
+            capacity=rule.capacity,
+            rate=rule.capacity / rule.per_seconds,
+        )
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests. Please try again later.",
+                headers={"Retry-After": str(retry_after)},
+            )
@@ -1,16 +1,32 @@
-from typing import Annotated, Any
+from typing import Annotated, Any, AsyncIterator
 
 from fastapi import Depends
-from sqlalchemy import delete, select, Sequence, text, update
+from sqlalchemy import (
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    Sequence,
+    text,
+    tuple_,
+    update,
+)
 from sqlalchemy.orm import (
     contains_eager,
+    InstrumentedAttribute,
     joinedload,
+    load_only,
     Relationship,
     selectinload,
 )
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from . import pagination
 from .schemas import PropertyFilter
+from .unit_of_work import UOW_SESSION_KEY
 from core.database import db
 from core.models import Base
 
@@ -24,6 +40,16 @@ class BaseRepo:
     ) -> None:
         self.session = session
 
+    async def _commit(self) -> None:
+        """
+        Commit changes, or only flush them, if they are a part
+        of an active `UnitOfWork`, which will commit them later.
+        """
+        if self.session.info.get(UOW_SESSION_KEY):
+            await self.session.flush()
+        else:
+            await self.session.commit()
+
     def _apply_filters(
         self,
         stmt: Any,
@@ -35,6 +61,35 @@ class BaseRepo:
                     stmt = stmt.filter(getattr(self.model, key) == value)
         return stmt
 
+    def _apply_load_fields(
+        self,
+        stmt: Any,
+        load_fields: list[str] | None,
+        required_fields: tuple[str, ...] = (),
+    ) -> Any:
+        """
+        Load only provided columns of the model (primary key is always
+        loaded). Names, which are not columns, are ignored, so
+        response schema fields can be passed as is
+        (check `api.utils.schemas.fields_of`).
+
+        Access to a column, that wasn't loaded, raises an error
+        instead of lazy loading it.
+        """
+        if load_fields:
+            columns = self.model.__table__.columns.keys()
+            fields = {
+                field for field in (*load_fields, *required_fields)
+                if field in columns
+            }
+            stmt = stmt.options(
+                load_only(
+                    *(getattr(self.model, field) for field in fields),
+                    raiseload=True,
+                ),
+            )
+        return stmt
+
     @staticmethod
     def _apply_property_filter(
         stmt: Any,
@@ -77,9 +132,27 @@ class CreateRepo[T](BaseRepo):
     ) -> T:
         new_obj = self.model(**data_dict)
         self.session.add(new_obj)
-        await self.session.commit()
+        await self._commit()
         return new_obj
 
+    async def create_many(
+        self,
+        data_dicts: list[dict[str, Any]],
+    ) -> list[T]:
+        """
+        Create many objects with one multi-row `INSERT ... RETURNING`
+        and one commit.
+        """
+        if not data_dicts:
+            return []
+        created = await self.session.scalars(
+            insert(self.model).returning(self.model),
+            data_dicts,
+        )
+        created = created.all()
+        await self._commit()
+        return created
+
 
 class GetOneRepo[T](BaseRepo):
     async def get_one(
@@ -88,8 +161,10 @@ class GetOneRepo[T](BaseRepo):
         property_filter: PropertyFilter | None = None,
         related_o2o_models: list[Relationship] | None = None,
         related_o2m_models: list[Relationship] | None = None,
+        load_fields: list[str] | None = None,
     ) -> T | None:
         stmt = select(self.model)
+        stmt = self._apply_load_fields(stmt, load_fields)
         stmt = self._add_related_o2o_models(stmt, related_o2o_models)
         stmt = self._add_related_o2m_models(stmt, related_o2m_models)
         stmt = self._apply_property_filter(stmt, property_filter)
@@ -97,7 +172,39 @@ class GetOneRepo[T](BaseRepo):
         return await self.session.scalar(stmt)
 
 
+class ExistsRepo[T](BaseRepo):
+    async def exists(
+        self,
+        filters: dict[str, Any],
+        property_filter: PropertyFilter | None = None,
+    ) -> bool:
+        """
+        Check if any row matches filters with `SELECT 1 ... LIMIT 1`,
+        without loading the object.
+        """
+        stmt = select(literal(1)).select_from(self.model)
+        stmt = self._apply_property_filter(stmt, property_filter)
+        stmt = self._apply_filters(stmt, filters)
+        return await self.session.scalar(stmt.limit(1)) is not None
+
+    async def count(
+        self,
+        filters: dict[str, Any] | None = None,
+        property_filter: PropertyFilter | None = None,
+    ) -> int:
+        """
+        Count rows matching filters without loading them.
+        """
+        stmt = select(func.count()).select_from(self.model)
+        stmt = self._apply_property_filter(stmt, property_filter)
+        stmt = self._apply_filters(stmt, filters)
+        return await self.session.scalar(stmt)
+
+
 class GetManyRepo[T](BaseRepo):
+    cursor_fields: tuple[str, str] = ("created", "id")
+    stream_yield_per: int = 500
+
     @staticmethod
     def _add_limit(stmt: Any, limit: int | None) -> Any:
         if limit is not None:
@@ -130,8 +237,10 @@ class GetManyRepo[T](BaseRepo):
         limit: int | None = None,
         offset: int | None = None,
         order_by: str | None = None,
+        load_fields: list[str] | None = None,
     ) -> Sequence[T] | None:
         stmt = select(self.model)
+        stmt = self._apply_load_fields(stmt, load_fields)
         stmt = self._add_related_o2o_models(stmt, related_o2o_models)
         stmt = self._add_related_o2m_models(stmt, related_o2m_models)
         stmt = self._apply_property_filter(stmt, property_filter)
@@ -141,6 +250,108 @@ class GetManyRepo[T](BaseRepo):
         stmt = self._apply_order(stmt, order_by)
         return await self.session.scalars(stmt)
 
+    async def get_many_by_ids(
+        self,
+        ids: list[int],
+        related_o2o_models: list[Relationship] | None = None,
+        related_o2m_models: list[Relationship] | None = None,
+        load_fields: list[str] | None = None,
+    ) -> list[T]:
+        """
+        Get objects by primary keys with one `WHERE id IN (...)` query,
+        in the order of `ids`. Missing objects are skipped.
+        """
+        if not ids:
+            return []
+        stmt = select(self.model).filter(self.model.id.in_(ids))
+        stmt = self._apply_load_fields(stmt, load_fields)
+        stmt = self._add_related_o2o_models(stmt, related_o2o_models)
+        stmt = self._add_related_o2m_models(stmt, related_o2m_models)
+        objs_by_id = {obj.id: obj for obj in await self.session.scalars(stmt)}
+        return [objs_by_id[obj_id] for obj_id in ids if obj_id in objs_by_id]
+
+    def _apply_cursor(
+        self,
+        stmt: Any,
+        cursor: str | None,
+        descending: bool,
+    ) -> Any:
+        columns = [getattr(self.model, f) for f in self.cursor_fields]
+        if cursor is not None:
+            cursor_values = pagination.decode_cursor(cursor)
+            if descending:
+                stmt = stmt.filter(tuple_(*columns) < tuple_(*cursor_values))
+            else:
+                stmt = stmt.filter(tuple_(*columns) > tuple_(*cursor_values))
+        if descending:
+            columns = [column.desc() for column in columns]
+        return stmt.order_by(*columns)
+
+    async def get_page(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        filters: dict[str, Any] | None = None,
+        property_filter: PropertyFilter | None = None,
+        related_o2o_models: list[Relationship] | None = None,
+        related_o2m_models: list[Relationship] | None = None,
+        descending: bool = False,
+        load_fields: list[str] | None = None,
+    ) -> tuple[list[T], str | None]:
+        """
+        Keyset (cursor) pagination ordered by `cursor_fields`.
+
+        Return page items and `next_cursor` (`None` on the last page).
+        Cost of a page doesn't depend on its depth, unlike `offset`.
+        """
+        stmt = select(self.model)
+        stmt = self._apply_load_fields(stmt, load_fields, self.cursor_fields)
+        stmt = self._add_related_o2o_models(stmt, related_o2o_models)
+        stmt = self._add_related_o2m_models(stmt, related_o2m_models)
+        stmt = self._apply_property_filter(stmt, property_filter)
+        stmt = self._apply_filters(stmt, filters)
+        stmt = self._apply_cursor(stmt, cursor, descending)
+        stmt = stmt.limit(limit + 1)
+        items = list(await self.session.scalars(stmt))
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = pagination.encode_cursor(
+                *(getattr(last, f) for f in self.cursor_fields)
+            )
+        return items, next_cursor
+
+    async def stream_many(
+        self,
+        filters: dict[str, Any] | None = None,
+        property_filter: PropertyFilter | None = None,
+        related_o2m_models: list[Relationship] | None = None,
+        descending: bool = False,
+        yield_per: int | None = None,
+        load_fields: list[str] | None = None,
+    ) -> AsyncIterator[T]:
+        """
+        Stream objects ordered by `cursor_fields` through
+        a server-side cursor, fetching `yield_per` rows at a time.
+
+        ** WARNING **
+            Session must stay open until iteration is over,
+            so don't use request session for `StreamingResponse`.
+        """
+        stmt = select(self.model)
+        stmt = self._apply_load_fields(stmt, load_fields)
+        stmt = self._add_related_o2m_models(stmt, related_o2m_models)
+        stmt = self._apply_property_filter(stmt, property_filter)
+        stmt = self._apply_filters(stmt, filters)
+        stmt = self._apply_cursor(stmt, None, descending)
+        stmt = stmt.execution_options(
+            yield_per=yield_per or self.stream_yield_per,
+        )
+        result = await self.session.stream_scalars(stmt)
+        async for obj in result:
+            yield obj
+
 
 class UpdateRepo[T](BaseRepo):
     async def update(
@@ -153,11 +364,156 @@ class UpdateRepo[T](BaseRepo):
         stmt = self._apply_filters(stmt, filters)
         if return_result:
             updated = await self.session.scalar(stmt.returning(self.model))
-            await self.session.commit()
+            await self._commit()
             return updated
         else:
             await self.session.execute(stmt)
-            await self.session.commit()
+            await self._commit()
+
+    async def update_many(
+        self,
+        update_dicts: list[dict[str, Any]],
+    ) -> None:
+        """
+        Update many rows with per-row values in one executemany
+        and one commit.
+
+        Every dict must contain primary key of the row (`id`).
+        """
+        if not update_dicts:
+            return
+        await self.session.execute(update(self.model), update_dicts)
+        await self._commit()
+
+
+class UpsertRepo[T](BaseRepo):
+    async def upsert(
+        self,
+        data_dict: dict[str, Any],
+        conflict_fields: list[str],
+        update_fields: list[str] | None = None,
+        only_if_changed: bool = False,
+    ) -> T | None:
+        """
+        Create or update object with a single
+        `INSERT ... ON CONFLICT (conflict_fields) DO UPDATE ... RETURNING`.
+
+        - `update_fields` are taken from `data_dict` on conflict,
+          if not provided, conflicting row is left as is (`DO NOTHING`).
+        - `only_if_changed` skips update, if values are the same.
+
+        Return `None` if nothing was inserted or updated.
+        `conflict_fields` must be covered by a unique constraint.
+        """
+        stmt = pg_insert(self.model).values(data_dict)
+        if update_fields:
+            where = None
+            if only_if_changed:
+                where = or_(*(
+                    getattr(self.model, field).is_distinct_from(
+                        stmt.excluded[field],
+                    )
+                    for field in update_fields
+                ))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=conflict_fields,
+                set_={field: stmt.excluded[field] for field in update_fields},
+                where=where,
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=conflict_fields)
+        upserted = await self.session.scalar(
+            stmt.returning(self.model),
+            execution_options={"populate_existing": True},
+        )
+        await self._commit()
+        return upserted
+
+
+class CounterRepo[T](BaseRepo):
+    """
+    Denormalized counter columns (e.g. `Post.comments_count`).
+
+    Counter updates aren't edits of the row, so columns with
+    `onupdate` (e.g. `Post.updated`) are kept as they are.
+    """
+    def _keep_onupdate_columns(self) -> dict[str, Any]:
+        return {
+            column.name: column
+            for column in self.model.__table__.columns
+            if column.onupdate is not None
+        }
+
+    async def increment(
+        self,
+        field: str,
+        filters: dict[str, Any],
+        by: int = 1,
+        return_field: str | None = None,
+    ) -> Any:
+        """
+        Add `by` to counter `field` with a single atomic
+        `UPDATE ... SET field = field + :by`, without loading the row.
+
+        Return value of `return_field` of the updated row
+        (`RETURNING return_field`), if it's provided.
+        """
+        stmt = update(self.model).values(
+            {
+                **self._keep_onupdate_columns(),
+                field: getattr(self.model, field) + by,
+            },
+        )
+        stmt = self._apply_filters(stmt, filters)
+        if return_field is not None:
+            value = await self.session.scalar(
+                stmt.returning(getattr(self.model, return_field)),
+            )
+            await self._commit()
+            return value
+        else:
+            await self.session.execute(stmt)
+            await self._commit()
+
+    async def reconcile(
+        self,
+        field: str,
+        related_field: InstrumentedAttribute,
+        batch_size: int,
+    ) -> int:
+        """
+        Recount counter `field` from rows, which reference this model
+        by `related_field` (e.g. `Comment.post_id`), and fix drifted
+        values. Rows are processed in primary key ranges of
+        `batch_size`, every range in its own transaction.
+
+        Return the number of fixed rows.
+        """
+        actual_count = (
+            select(func.count())
+            .select_from(related_field.class_)
+            .filter(related_field == self.model.id)
+            .scalar_subquery()
+        )
+        counter = getattr(self.model, field)
+        max_id = await self.session.scalar(select(func.max(self.model.id)))
+        fixed = 0
+        last_id = 0
+        while max_id is not None and last_id < max_id:
+            stmt = (
+                update(self.model)
+                .filter(
+                    self.model.id > last_id,
+                    self.model.id <= last_id + batch_size,
+                    counter != actual_count,
+                )
+                .values({**self._keep_onupdate_columns(), field: actual_count})
+            )
+            result = await self.session.execute(stmt)
+            await self._commit()
+            fixed += result.rowcount
+            last_id += batch_size
+        return fixed
 
 
 class DeleteRepo[T](BaseRepo):
@@ -170,8 +526,32 @@ class DeleteRepo[T](BaseRepo):
         stmt = self._apply_filters(stmt, filters)
         if return_result:
             deleted = await self.session.scalar(stmt.returning(self.model))
-            await self.session.commit()
+            await self._commit()
             return deleted
         else:
             await self.session.execute(stmt)
-            await self.session.commit()
+            await self._commit()
+
+    async def delete_many(
+        self,
+        field: str,
+        values: list[Any],
+        return_result: bool = False,
+    ) -> list[T] | None:
+        """
+        Delete all rows, which `field` value is in `values`,
+        with one statement and one commit.
+        """
+        if not values:
+            return [] if return_result else None
+        stmt = delete(self.model).filter(
+            getattr(self.model, field).in_(values),
+        )
+        if return_result:
+            deleted = await self.session.scalars(stmt.returning(self.model))
+            deleted = deleted.all()
+            await self._commit()
+            return deleted
+        else:
+            await self.session.execute(stmt)
+            await self._commit()
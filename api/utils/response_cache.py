@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import secrets
+from functools import cache
+from typing import Any, Awaitable, Callable
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database import PRIMARY_ONLY_KEY
+from core.redis import redis_client
+from core.settings import ResponseCacheSettings, settings
+
+
+logger = logging.getLogger(__name__)
+
+
+# KEYS[1] - author tag key.
+# ARGV[1] - response key without tag version.
+# Return `{tag version, cached body or nil}`.
+GET_SCRIPT = """
+local version = redis.call("GET", KEYS[1]) or "0"
+return {version, redis.call("GET", ARGV[1] .. ":" .. version)}
+"""
+
+# KEYS[1] - lock key.
+# ARGV[1] - lock token.
+UNLOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+@cache
+def _get_adapter(response_model: Any) -> TypeAdapter:
+    return TypeAdapter(response_model)
+
+
+def dump_json(response_model: Any, content: Any) -> bytes:
+    """
+    Validate `content` (ORM objects, dicts) with `response_model`
+    and dump it to JSON, as FastAPI does for route's `response_model`.
+    """
+    adapter = _get_adapter(response_model)
+    return adapter.dump_json(
+        adapter.validate_python(content, from_attributes=True),
+    )
+
+
+def cached_json_response(body: bytes, response: Response) -> Response:
+    """
+    Response with cached JSON `body` and headers set on `response`
+    by dependencies (e.g. `ETag`), FastAPI doesn't add them
+    to responses returned from routes.
+    """
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers=dict(response.headers),
+    )
+
+
+class ResponseCache:
+    """
+    Serialized bodies of public read routes (the same for every viewer)
+    in Redis, keyed by route name and parameters, and tagged by
+    author id.
+
+    Every author has a tag version, which is a part of the keys
+    of their responses, so `invalidate()` is one `INCR`: old responses
+    are never read again and expire in `ttl_seconds`. A response,
+    rebuilt from data read before invalidation, is stored under
+    the old version, so it's never served either.
+
+    Responses are rebuilt from primary database: a replica may not
+    have replayed the write, which invalidated them yet.
+
+    Only one request rebuilds a missing response (under a Redis lock),
+    the others wait for it up to `lock_wait_ms`, then build their
+    responses themselves, without caching.
+
+    Redis errors are logged and treated as cache misses.
+
+    ** WARNING **
+        Every write, which changes a cached response,
+        must call `invalidate()` with author id after commit.
+
+    Usage:
+        ```
+        body = await response_cache.get_or_build(
+            session=session,
+            name="post",
+            author_id=author_id,
+            params=(post_id,),
+            response_model=PostResponse,
+            build=partial(post_service.get_post, post_id=post_id),
+        )
+        return cached_json_response(body, response)
+        ```
+    """
+    def __init__(
+        self,
+        redis: Redis,
+        cache_settings: ResponseCacheSettings,
+    ) -> None:
+        self.redis = redis
+        self.settings = cache_settings
+        self.get_script = redis.register_script(GET_SCRIPT)
+        self.unlock_script = redis.register_script(UNLOCK_SCRIPT)
+
+    # Tag versions don't expire, a reset version
+    # could point to responses cached before.
+    @staticmethod
+    def _tag_key(author_id: int) -> str:
+        return f"responses:author:{author_id}"
+
+    @staticmethod
+    def _response_key(name: str, author_id: int, params: tuple) -> str:
+        return ":".join(
+            ("responses", name, str(author_id), *map(str, params)),
+        )
+
+    async def _get(
+        self,
+        name: str,
+        author_id: int,
+        params: tuple,
+    ) -> tuple[str, bytes | None]:
+        """
+        Get response key with the current tag version
+        and cached body (`None` on miss).
+        """
+        response_key = self._response_key(name, author_id, params)
+        version, body = await self.get_script(
+            keys=[self._tag_key(author_id)],
+            args=[response_key],
+        )
+        return f"{response_key}:{version.decode()}", body
+
+    async def _wait_for(self, key: str) -> bytes | None:
+        """
+        Poll for a response, which is being rebuilt by other request.
+        """
+        polls = self.settings.lock_wait_ms // self.settings.lock_poll_ms
+        for _ in range(polls):
+            await asyncio.sleep(self.settings.lock_poll_ms / 1000)
+            body = await self.redis.get(key)
+            if body is not None:
+                return body
+        return None
+
+    async def _build_and_set(
+        self,
+        key: str,
+        build: Callable[[], Awaitable[bytes]],
+    ) -> bytes:
+        lock_key = f"{key}:lock"
+        token = secrets.token_hex(8)
+        is_locked = await self.redis.set(
+            lock_key,
+            token,
+            nx=True,
+            px=self.settings.lock_ttl_ms,
+        )
+        if not is_locked:
+            body = await self._wait_for(key)
+            return body if body is not None else await build()
+        try:
+            body = await build()
+        except BaseException:
+            await self._unlock(lock_key, token)
+            raise
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.set(key, body, ex=self.settings.ttl_seconds)
+                await self.unlock_script(
+                    keys=[lock_key],
+                    args=[token],
+                    client=pipe,
+                )
+                await pipe.execute()
+        except RedisError as error:
+            logger.warning("Response cache is unavailable: %s", error)
+        return body
+
+    async def _unlock(self, lock_key: str, token: str) -> None:
+        try:
+            await self.unlock_script(keys=[lock_key], args=[token])
+        except RedisError as error:
+            logger.warning("Response cache is unavailable: %s", error)
+
+    async def get_or_build(
+        self,
+        session: AsyncSession,
+        name: str,
+        author_id: int,
+        params: tuple,
+        response_model: Any,
+        build: Callable[[], Awaitable[Any]],
+    ) -> bytes:
+        """
+        Get cached JSON body of route `name` with `params`,
+        or build it with `build()` (and cache it) on miss.
+        `build()` must use `session`, which is switched to primary.
+
+        Exceptions of `build()` (e.g. `HTTPException`) are raised
+        as is, nothing is cached then.
+        """
+        async def build_body() -> bytes:
+            session.info[PRIMARY_ONLY_KEY] = True
+            return dump_json(response_model, await build())
+
+        if not self.settings.enabled:
+            return await build_body()
+        try:
+            key, body = await self._get(name, author_id, params)
+        except RedisError as error:
+            logger.warning("Response cache is unavailable: %s", error)
+            return await build_body()
+        if body is not None:
+            return body
+        try:
+            return await self._build_and_set(key, build_body)
+        except RedisError as error:
+            logger.warning("Response cache is unavailable: %s", error)
+            return await build_body()
+
+    async def invalidate(self, *author_ids: int) -> None:
+        """
+        Invalidate all cached responses of authors.
+        """
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for author_id in author_ids:
+                    pipe.incr(self._tag_key(author_id))
+                await pipe.execute()
+        except RedisError as error:
+            logger.warning("Response cache invalidation failed: %s", error)
+
+
+response_cache = ResponseCache(
+    redis=redis_client,
+    cache_settings=settings.response_cache,
+)
@@ -28,3 +28,22 @@ class PropertyFilter(BaseModel):
     model_field: Any
     field_value: Any
     return_model: bool = False
+
+
+class Page[T](BaseModel):
+    """
+    One page of keyset-paginated results.
+
+    `next_cursor` is `None` on the last page.
+    """
+
+    items: list[T]
+    next_cursor: str | None = None
+
+
+def fields_of(schema: type[BaseModel]) -> list[str]:
+    """
+    Field names of a response schema, to be used as `load_fields`
+    in repositories, so only required columns are selected.
+    """
+    return list(schema.model_fields)
@@ -0,0 +1,64 @@
+from enum import StrEnum
+from typing import Any, AsyncIterator
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+
+class StreamFormat(StrEnum):
+    ndjson = "ndjson"
+    json = "json"
+
+
+MEDIA_TYPES = {
+    StreamFormat.ndjson: "application/x-ndjson",
+    StreamFormat.json: "application/json",
+}
+
+
+def _dump(obj: Any, schema: type[BaseModel]) -> bytes:
+    return schema.model_validate(
+        obj,
+        from_attributes=True,
+    ).model_dump_json().encode()
+
+
+async def encode_ndjson(
+    objects: AsyncIterator[Any],
+    schema: type[BaseModel],
+) -> AsyncIterator[bytes]:
+    """
+    Encode every object as one JSON line.
+    """
+    async for obj in objects:
+        yield _dump(obj, schema) + b"\n"
+
+
+async def encode_json_array(
+    objects: AsyncIterator[Any],
+    schema: type[BaseModel],
+) -> AsyncIterator[bytes]:
+    """
+    Encode objects as one JSON array, element by element.
+    """
+    separator = b"["
+    async for obj in objects:
+        yield separator + _dump(obj, schema)
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
+
+
+def streaming_response(
+    objects: AsyncIterator[Any],
+    schema: type[BaseModel],
+    stream_format: StreamFormat = StreamFormat.ndjson,
+) -> StreamingResponse:
+    """
+    Serialize `objects` with `schema` while they are being fetched,
+    so the first byte is sent before the last row is read.
+    """
+    if stream_format == StreamFormat.ndjson:
+        body = encode_ndjson(objects, schema)
+    else:
+        body = encode_json_array(objects, schema)
+    return StreamingResponse(body, media_type=MEDIA_TYPES[stream_format])
@@ -0,0 +1,65 @@
+from types import TracebackType
+from typing import Annotated
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.database import db
+
+
+UOW_SESSION_KEY = "unit_of_work"
+
+
+class UnitOfWork:
+    """
+    Request-scoped unit of work.
+
+    Session is shared by every repository of the request, so while
+    unit of work is active repositories only flush their changes
+    and all of them are committed once on exit (or rolled back
+    if an exception was raised).
+
+    Usage:
+        ```
+        @router.post("/any")
+        async def create_any(
+            uow: Annotated[UnitOfWork, Depends(UnitOfWork)],
+            any_service: Annotated[AnyService, Depends(AnyService)],
+            other_service: Annotated[OtherService, Depends(OtherService)],
+        ):
+            async with uow:
+                obj = await any_service.create_any(...)
+                await other_service.create_other(obj)
+            return obj
+        ```
+    """
+    def __init__(
+        self,
+        session: Annotated[AsyncSession, Depends(db.get_async_session)],
+    ) -> None:
+        self.session = session
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self.is_nested = bool(self.session.info.get(UOW_SESSION_KEY))
+        self.session.info[UOW_SESSION_KEY] = True
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if self.is_nested:
+            return
+        self.session.info.pop(UOW_SESSION_KEY, None)
+        if exc_type is None:
+            await self.commit()
+        else:
+            await self.rollback()
+
+    async def commit(self) -> None:
+        await self.session.commit()
+
+    async def rollback(self) -> None:
+        await self.session.rollback()
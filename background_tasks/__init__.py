@@ -1,4 +1,9 @@
 __all__ = (
+    "backfill_feed",
+    "fan_out_post",
+    "prune_feed",
+    "purge_expired_refresh_tokens",
+    "reconcile_counters",
     "save_profile_image",
     "send_reset_token",
     "send_verification_url",
@@ -6,6 +11,11 @@ __all__ = (
 
 
 from .tasks import (
+    backfill_feed,
+    fan_out_post,
+    prune_feed,
+    purge_expired_refresh_tokens,
+    reconcile_counters,
     save_profile_image,
     send_reset_token,
     send_verification_url,
@@ -9,5 +9,17 @@ celery_app.conf.update(
     broker_url=settings.redis.url,
     result_backend=settings.redis.url,
     broker_connection_retry_on_startup=True,
+    beat_schedule={
+        "purge-expired-refresh-tokens": {
+            "task": "background_tasks.tasks.purge_expired_refresh_tokens",
+            "schedule": (
+                settings.auth.jwt.refresh_token_purge_interval_minutes * 60
+            ),
+        },
+        "reconcile-counters": {
+            "task": "background_tasks.tasks.reconcile_counters",
+            "schedule": settings.counters.reconcile_interval_minutes * 60,
+        },
+    },
 )
 celery_app.autodiscover_tasks()
@@ -1,9 +1,22 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import UploadFile
 from pydantic import EmailStr
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import NullPool
 
 from .files.file_service import file_service
 from .notifications.email_service import email_service
 from .celery import celery_app
+from core.database import get_connect_args
+from core.settings import settings
 
 
 @celery_app.task
@@ -21,3 +34,189 @@ def send_verification_url(email: EmailStr, url: str) -> None:
 @celery_app.task
 def save_profile_image(image_to_save: UploadFile, image_url: str) -> None:
     file_service.save_file(image_to_save, image_url)
+
+
+@asynccontextmanager
+async def _task_session() -> AsyncIterator[AsyncSession]:
+    """
+    Database session for a task.
+
+    Every task runs in its own event loop, pooled connections
+    can't outlive it, so engine is disposed afterwards.
+    """
+    engine = create_async_engine(
+        settings.db.url,
+        poolclass=NullPool,
+        connect_args=get_connect_args(settings.db.pgbouncer_mode),
+    )
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    try:
+        async with session_maker() as session:
+            yield session
+    finally:
+        await engine.dispose()
+
+
+@asynccontextmanager
+async def _task_redis() -> AsyncIterator[Redis]:
+    redis = Redis.from_url(settings.redis.url)
+    try:
+        yield redis
+    finally:
+        await redis.aclose()
+
+
+# `api` imports this module, so repositories are imported lazily.
+
+
+async def _purge_expired_refresh_tokens(batch_size: int) -> int:
+    from api.auth.access_token.repositories import AccessTokenRepo
+
+    purged = 0
+    async with _task_session() as session:
+        token_repo = AccessTokenRepo(session)
+        while True:
+            deleted = await token_repo.delete_expired(batch_size)
+            purged += deleted
+            if deleted < batch_size:
+                return purged
+
+
+@celery_app.task
+def purge_expired_refresh_tokens() -> int:
+    """
+    Delete expired refresh tokens in batches
+    (`settings.auth.jwt.refresh_token_purge_batch_size`).
+    """
+    return asyncio.run(
+        _purge_expired_refresh_tokens(
+            settings.auth.jwt.refresh_token_purge_batch_size,
+        ),
+    )
+
+
+async def _get_latest_post_ids(
+    session: AsyncSession,
+    author_id: int,
+    limit: int,
+) -> list[int]:
+    from api.posts.repositories import PostRepo
+
+    posts, _ = await PostRepo(session).get_page(
+        limit=limit,
+        filters={"user_id": author_id},
+        descending=True,
+        load_fields=["id"],
+    )
+    return [post.id for post in posts]
+
+
+async def _fan_out_post(post_id: int, author_id: int) -> None:
+    from api.feeds.cache import FeedCache
+    from api.follows.repositories import FollowRepo
+
+    async with _task_session() as session, _task_redis() as redis:
+        feed_cache = FeedCache(redis, settings.feed.max_length)
+        follow_repo = FollowRepo(session)
+        followers_count = await follow_repo.count(
+            filters={"owner_id": author_id},
+        )
+        if followers_count > settings.feed.fan_out_max_followers:
+            await feed_cache.add_to_timeline(author_id, post_id)
+            return
+        follower_ids = follow_repo.stream_follower_ids(
+            owner_id=author_id,
+            batch_size=settings.feed.fan_out_batch_size,
+        )
+        async for batch in follower_ids:
+            await feed_cache.add_to_feeds(batch, [post_id])
+
+
+@celery_app.task
+def fan_out_post(post_id: int, author_id: int) -> None:
+    """
+    Add new post to feeds of author's followers (fan-out on write),
+    or to author's timeline, if author has too many followers
+    (fan-out on read).
+    """
+    asyncio.run(_fan_out_post(post_id, author_id))
+
+
+async def _backfill_feed(user_id: int, author_id: int) -> None:
+    from api.feeds.cache import FeedCache
+
+    async with _task_session() as session, _task_redis() as redis:
+        post_ids = await _get_latest_post_ids(
+            session,
+            author_id,
+            settings.feed.backfill_posts,
+        )
+        feed_cache = FeedCache(redis, settings.feed.max_length)
+        await feed_cache.add_to_feeds([user_id], post_ids)
+
+
+@celery_app.task
+def backfill_feed(user_id: int, author_id: int) -> None:
+    """
+    Add latest posts of a newly followed author to user's feed.
+    """
+    asyncio.run(_backfill_feed(user_id, author_id))
+
+
+async def _prune_feed(user_id: int, author_id: int) -> None:
+    from api.feeds.cache import FeedCache
+
+    async with _task_session() as session, _task_redis() as redis:
+        post_ids = await _get_latest_post_ids(
+            session,
+            author_id,
+            settings.feed.max_length,
+        )
+        feed_cache = FeedCache(redis, settings.feed.max_length)
+        await feed_cache.remove_from_feed(user_id, post_ids)
+
+
+@celery_app.task
+def prune_feed(user_id: int, author_id: int) -> None:
+    """
+    Remove posts of an unfollowed author from user's feed.
+    """
+    asyncio.run(_prune_feed(user_id, author_id))
+
+
+async def _reconcile_counters(batch_size: int) -> dict[str, int]:
+    from api.posts.repositories import PostRepo
+    from api.sub_tiers.repositories import SubTierRepo
+    from api.users.repositories import UserRepo
+    from core.models import Comment, Follow, Post, Subscription
+
+    async with _task_session() as session:
+        user_repo = UserRepo(session)
+        sub_tier_repo = SubTierRepo(session)
+        post_repo = PostRepo(session)
+        counters = (
+            (user_repo, "followers_count", Follow.owner_id),
+            (user_repo, "posts_count", Post.user_id),
+            (sub_tier_repo, "subscribers_count", Subscription.sub_tier_id),
+            (post_repo, "comments_count", Comment.post_id),
+        )
+        return {
+            f"{repo.model.__tablename__}.{field}": await repo.reconcile(
+                field,
+                related_field,
+                batch_size,
+            )
+            for repo, field, related_field in counters
+        }
+
+
+@celery_app.task
+def reconcile_counters() -> dict[str, int]:
+    """
+    Recount denormalized counters and fix drifted ones
+    (e.g. after cascade deletes, which bypass services).
+    Return the number of fixed rows per counter.
+    """
+    return asyncio.run(
+        _reconcile_counters(settings.counters.reconcile_batch_size),
+    )
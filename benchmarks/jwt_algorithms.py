@@ -0,0 +1,87 @@
+"""
+Sign/verify throughput of JWT algorithms supported by `JWTSettings`,
+with keys parsed once (as `api.auth.access_token.keys.KeyRing` does)
+and, for comparison, RS256 with PEM text parsed on every call.
+
+Usage:
+    ```
+    python -m benchmarks.jwt_algorithms --iterations 2000
+    ```
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+
+PAYLOAD = {
+    "type": "access",
+    "sub": "benchmark",
+    "id": 1,
+    "exp": datetime.now(timezone.utc) + timedelta(hours=1),
+}
+
+
+def ops_per_second(func: Callable[[], Any], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - start)
+
+
+def to_pem(private_key: Any) -> tuple[bytes, bytes]:
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+    return private_pem, public_pem
+
+
+def bench(
+    name: str,
+    algorithm: str,
+    signing_key: Any,
+    verification_key: Any,
+    iterations: int,
+) -> None:
+    token = jwt.encode(PAYLOAD, signing_key, algorithm=algorithm)
+    sign = ops_per_second(
+        lambda: jwt.encode(PAYLOAD, signing_key, algorithm=algorithm),
+        iterations,
+    )
+    verify = ops_per_second(
+        lambda: jwt.decode(token, verification_key, algorithms=[algorithm]),
+        iterations,
+    )
+    print(f"{name:>14}: sign {sign:10.1f} ops/s  verify {verify:10.1f} ops/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    rsa_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    rsa_private_pem, rsa_public_pem = to_pem(rsa_key)
+    bench("RS256 (PEM)", "RS256", rsa_private_pem, rsa_public_pem,
+          args.iterations)
+    bench("RS256", "RS256", rsa_key, rsa_key.public_key(), args.iterations)
+
+    ec_key = ec.generate_private_key(ec.SECP256R1())
+    bench("ES256", "ES256", ec_key, ec_key.public_key(), args.iterations)
+
+    ed_key = ed25519.Ed25519PrivateKey.generate()
+    bench("EdDSA", "EdDSA", ed_key, ed_key.public_key(), args.iterations)
+
+
+if __name__ == "__main__":
+    main()
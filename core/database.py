@@ -1,30 +1,217 @@
-from typing import AsyncGenerator
+import itertools
+import time
+import uuid
+from typing import Any, AsyncGenerator
 
+from sqlalchemy import Delete, Insert, Select, Update
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from core.metrics import POOL_CHECKOUT_WAIT, register_pool_metrics
+from core.query_stats import instrument_engine
 from core.settings import settings
 
 
+PRIMARY_ONLY_KEY = "primary_only"
+REPLICA_KEY = "replica"
+USER_ID_KEY = "user_id"
+
+
+class ReplicaRouter:
+    """
+    Choose engine for a statement: primary for writes,
+    one of the read replicas for reads.
+
+    Users, who have written something recently (`read_your_writes_seconds`),
+    are routed to primary, so they never see their own writes missing
+    because of replication lag.
+    Recent writes are tracked per worker process.
+    """
+    max_tracked_users: int = 10_000
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: list[AsyncEngine],
+        strategy: str,
+        read_your_writes_seconds: float,
+    ) -> None:
+        self.primary = primary
+        self.replicas = replicas
+        self.strategy = strategy
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self._replicas_cycle = itertools.cycle(replicas)
+        self._recent_writes: dict[int, float] = dict()
+
+    def get_read_engine(self) -> AsyncEngine:
+        if self.strategy == "least_connections":
+            return min(
+                self.replicas,
+                key=lambda engine: engine.pool.checkedout(),
+            )
+        return next(self._replicas_cycle)
+
+    def mark_write(self, user_id: int) -> None:
+        now = time.monotonic()
+        if len(self._recent_writes) >= self.max_tracked_users:
+            self._recent_writes = {
+                key: value for key, value in self._recent_writes.items()
+                if now - value < self.read_your_writes_seconds
+            }
+        self._recent_writes[user_id] = now
+
+    def recently_wrote(self, user_id: int) -> bool:
+        last_write = self._recent_writes.get(user_id)
+        return (
+            last_write is not None
+            and time.monotonic() - last_write < self.read_your_writes_seconds
+        )
+
+
+class RoutingSession(Session):
+    """
+    Session, which sends plain `SELECT` statements to read replicas.
+
+    Replica is chosen once per session, so all reads of a request
+    see the same replication point (e.g. a page and its comments).
+    Once session has written anything, all its following statements
+    go to primary (read-your-writes inside the request).
+    """
+    def __init__(self, *args: Any, router: ReplicaRouter, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.router = router
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info[PRIMARY_ONLY_KEY] = True
+        elif (
+            isinstance(clause, Select)
+            and self.router.replicas
+            and not self.info.get(PRIMARY_ONLY_KEY)
+        ):
+            replica = self.info.get(REPLICA_KEY)
+            if replica is None:
+                replica = self.router.get_read_engine()
+                self.info[REPLICA_KEY] = replica
+            return replica.sync_engine
+        return self.router.primary.sync_engine
+
+    def commit(self) -> None:
+        super().commit()
+        user_id = self.info.get(USER_ID_KEY)
+        if self.info.get(PRIMARY_ONLY_KEY) and user_id is not None:
+            self.router.mark_write(user_id)
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def get_connect_args(pgbouncer_mode: bool) -> dict[str, Any]:
+    """
+    Arguments for `asyncpg.connect`.
+
+    Transaction-mode poolers (PgBouncer) may run each transaction on
+    a different server connection, so named prepared statements
+    created on one connection are missing (or clash) on another.
+    In `pgbouncer_mode` statement caches are disabled and every
+    prepared statement gets a unique name.
+    """
+    if pgbouncer_mode:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    return {
+        "statement_cache_size": settings.db.statement_cache_size,
+        "prepared_statement_cache_size": (
+            settings.db.prepared_statement_cache_size
+        ),
+    }
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Pool, which records time spent waiting for a connection
+    (labeled by `pool_logging_name` of the engine).
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.labels(self._orig_logging_name).observe(
+                time.perf_counter() - start,
+            )
+
+
 class Database:
     def __init__(self):
-        self.engine = create_async_engine(
-            url=settings.db.url,
-            echo=settings.db.echo,
+        self.engine = self._create_engine(settings.db.url, "primary")
+        self.replica_engines = [
+            self._create_engine(url, f"replica_{i}")
+            for i, url in enumerate(settings.db.replica_urls)
+        ]
+        engines = {"primary": self.engine}
+        for i, engine in enumerate(self.replica_engines):
+            engines[f"replica_{i}"] = engine
+        if settings.query_stats.enabled:
+            for engine in engines.values():
+                instrument_engine(engine)
+        if settings.app.metrics_enabled:
+            register_pool_metrics(engines)
+        self.router = ReplicaRouter(
+            primary=self.engine,
+            replicas=self.replica_engines,
+            strategy=settings.db.replica_strategy,
+            read_your_writes_seconds=settings.db.read_your_writes_seconds,
         )
         self.session_maker = async_sessionmaker(
             bind=self.engine,
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
+            sync_session_class=RoutingSession,
+            router=self.router,
+        )
+
+    @staticmethod
+    def _create_engine(url: str, name: str) -> AsyncEngine:
+        return create_async_engine(
+            url=url,
+            echo=settings.db.echo,
+            poolclass=TimedAsyncAdaptedQueuePool,
+            pool_logging_name=name,
+            pool_size=settings.db.pool_size,
+            max_overflow=settings.db.max_overflow,
+            pool_timeout=settings.db.pool_timeout,
+            pool_recycle=settings.db.pool_recycle,
+            pool_pre_ping=settings.db.pool_pre_ping,
+            connect_args=get_connect_args(settings.db.pgbouncer_mode),
         )
 
     async def get_async_session(self) -> AsyncGenerator[AsyncSession, None]:
         async with self.session_maker() as session:
             yield session
 
+    def bind_user(self, session: AsyncSession, user_id: int | None) -> None:
+        """
+        Bind current session user to a session: route their reads
+        to primary, if they have written something recently,
+        and remember their writes on commit.
+        """
+        if user_id is None:
+            return
+        session.info[USER_ID_KEY] = user_id
+        if self.router.recently_wrote(user_id):
+            session.info[PRIMARY_ONLY_KEY] = True
+
 
 db = Database()
@@ -0,0 +1,58 @@
+from typing import Iterator
+
+from prometheus_client import Histogram, REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool.",
+    ["engine"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+
+
+class PoolMetricsCollector(Collector):
+    """
+    Report live connection pool state of every engine on each scrape.
+
+    Metrics are per worker process, so pool size can be tuned
+    for one uvicorn worker.
+    """
+    def __init__(self, engines: dict[str, AsyncEngine]) -> None:
+        self.engines = engines
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        size = GaugeMetricFamily(
+            "db_pool_size",
+            "Configured number of persistent connections.",
+            labels=["engine"],
+        )
+        checked_out = GaugeMetricFamily(
+            "db_pool_checked_out",
+            "Connections currently in use.",
+            labels=["engine"],
+        )
+        idle = GaugeMetricFamily(
+            "db_pool_idle",
+            "Connections currently idle in the pool.",
+            labels=["engine"],
+        )
+        overflow = GaugeMetricFamily(
+            "db_pool_overflow",
+            "Connections opened above pool size.",
+            labels=["engine"],
+        )
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            size.add_metric([name], pool.size())
+            checked_out.add_metric([name], pool.checkedout())
+            idle.add_metric([name], pool.checkedin())
+            overflow.add_metric([name], max(pool.overflow(), 0))
+        yield from (size, checked_out, idle, overflow)
+
+
+def register_pool_metrics(engines: dict[str, AsyncEngine]) -> None:
+    REGISTRY.register(PoolMetricsCollector(engines))
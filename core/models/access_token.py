@@ -13,11 +13,16 @@ if TYPE_CHECKING:
 
 
 class AccessToken(Base):
+    """
+    Refresh token of a user session,
+    stored as SHA-256 hexdigest (never as raw token).
+    """
     __tablename__ = "access_tokens"
 
-    token: Mapped[str] = mapped_column(String(512), primary_key=True)
+    token_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
+        index=True,
     )
     expired: Mapped[datetime] = mapped_column(
         default=func.now() + timedelta(
@@ -26,4 +31,4 @@ class AccessToken(Base):
         index=True,
     )
 
-    user: Mapped["User"] = relationship(back_populates="token")
+    user: Mapped["User"] = relationship(back_populates="tokens")
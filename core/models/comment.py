@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, func, String
+from sqlalchemy import ForeignKey, func, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -14,6 +14,12 @@ if TYPE_CHECKING:
 
 class Comment(Base, IntIdPkMixin):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index(
+            "ix__comment__post_id__created__id",
+            "post_id", "created", "id",
+        ),
+    )
 
     text: Mapped[str] = mapped_column(String(500))
     created: Mapped[datetime] = mapped_column(default=func.now())
@@ -1,7 +1,16 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, func, String, Text
+from sqlalchemy import (
+    Computed,
+    ForeignKey,
+    func,
+    Index,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -12,8 +21,22 @@ if TYPE_CHECKING:
     from core.models import Comment, SubTier, User
 
 
+SEARCH_CONFIG = "english"
+
+
 class Post(Base, IntIdPkMixin):
     __tablename__ = "posts"
+    __table_args__ = (
+        Index(
+            "ix__post__user_id__created__id",
+            "user_id", "created", "id",
+        ),
+        Index(
+            "ix__post__search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+    )
 
     title: Mapped[str] = mapped_column(String(128))
     text: Mapped[str] = mapped_column(Text, nullable=True)
@@ -23,6 +46,23 @@ class Post(Base, IntIdPkMixin):
         onupdate=func.now(),
         nullable=True,
     )
+    comments_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+    )
+    # Generated by database from title (weight A) and text (weight B).
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+            f"coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{SEARCH_CONFIG}', "
+            f"coalesce(text, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
     )
@@ -1,6 +1,7 @@
+from datetime import datetime
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, String, UniqueConstraint
+from sqlalchemy import func, ForeignKey, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -28,6 +29,17 @@ class SubTier(Base, IntIdPkMixin):
     text: Mapped[str] = mapped_column(String(256))
     image_url: Mapped[str] = mapped_column(String, nullable=True)
     price: Mapped[int] = mapped_column()
+    updated: Mapped[datetime] = mapped_column(
+        onupdate=func.now(),
+        nullable=True,
+    )
+    # Denormalized counter, maintained on writes
+    # and reconciled by `reconcile_counters` task.
+    subscribers_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+    )
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"),
     )
@@ -1,6 +1,6 @@
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import String, Boolean
+from sqlalchemy import String, Boolean, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
@@ -35,8 +35,29 @@ class User(Base, IntIdPkMixin):
     is_author: Mapped[bool] = mapped_column(Boolean, default=False)
     is_admin: Mapped[bool] = mapped_column(Boolean, default=False)
     is_superuser: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Incremented on every change of the flags above,
+    # invalidates roles claims of issued access tokens.
+    roles_version: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+    )
+    # Denormalized counters, maintained on writes
+    # and reconciled by `reconcile_counters` task.
+    followers_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+    )
+    posts_count: Mapped[int] = mapped_column(
+        Integer,
+        default=0,
+        server_default="0",
+    )
 
-    token: Mapped[Optional["AccessToken"]] = relationship()
+    tokens: Mapped[Optional[list["AccessToken"]]] = relationship(
+        back_populates="user",
+    )
     profile: Mapped[Optional["Profile"]] = relationship(back_populates="user")
     sub_tiers: Mapped[Optional[list["SubTier"]]] = relationship(
         back_populates="user",
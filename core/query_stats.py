@@ -0,0 +1,166 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.middleware.base import (
+    BaseHTTPMiddleware,
+    RequestResponseEndpoint,
+)
+
+from core.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+_current_stats: ContextVar["QueryStats | None"] = ContextVar(
+    "query_stats",
+    default=None,
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    """
+    Statements executed (and time spent in database) during a request.
+
+    Statements are grouped by their shape (SQL with placeholders),
+    so the same statement repeated many times points to N+1 queries.
+    """
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.duration: float = 0.0
+        self.shapes: Counter[str] = Counter()
+        self.budget: int | None = None
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement] += 1
+
+    @property
+    def repeated_shapes(self) -> dict[str, int]:
+        threshold = settings.query_stats.n_plus_one_threshold
+        return {
+            shape: count for shape, count in self.shapes.items()
+            if count >= threshold
+        }
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Count statements executed inside the block.
+
+    Usage:
+        ```
+        with track_queries() as stats:
+            await post_service.get_post(post_id=1)
+        assert stats.count <= 2
+        ```
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+# Start time is kept on the execution context, not on the connection:
+# a failed statement has no `after_cursor_execute`, and its context
+# is discarded with it.
+def _before_cursor_execute(conn, cursor, statement, parameters,
+                           context, executemany) -> None:
+    context.query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters,
+                          context, executemany) -> None:
+    duration = time.perf_counter() - context.query_start
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        _before_cursor_execute,
+    )
+    event.listen(
+        engine.sync_engine,
+        "after_cursor_execute",
+        _after_cursor_execute,
+    )
+
+
+class QueryBudget:
+    """
+    Declare max number of statements a route is allowed to execute.
+
+    Exceeding the budget is logged, or raises `QueryBudgetExceeded`
+    if `settings.query_stats.strict_budget` is on (e.g. in tests).
+
+    Usage:
+        ```
+        @router.get(
+            "/any",
+            dependencies=[Depends(QueryBudget(2))],
+        )
+        async def get_any():
+            ...
+        ```
+    """
+    def __init__(self, max_queries: int) -> None:
+        self.max_queries = max_queries
+
+    async def __call__(self) -> None:
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.budget = self.max_queries
+
+
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """
+    Count statements and database time per request, expose them
+    as `X-DB-Query-Count` / `X-DB-Query-Time` (ms) response headers
+    and log possible N+1 queries and exceeded query budgets.
+    """
+    async def dispatch(
+        self,
+        request: Request,
+        call_next: RequestResponseEndpoint,
+    ) -> Response:
+        with track_queries() as stats:
+            response = await call_next(request)
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Query-Time"] = f"{stats.duration * 1000:.2f}"
+        route = f"{request.method} {request.url.path}"
+        for shape, count in stats.repeated_shapes.items():
+            logger.warning(
+                "Possible N+1 in %s: statement executed %d times: %s",
+                route, count, shape,
+            )
+        if stats.over_budget:
+            message = (
+                f"{route} executed {stats.count} statements, "
+                f"budget is {stats.budget}."
+            )
+            if settings.query_stats.strict_budget:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
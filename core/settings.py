@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from fastapi.security import HTTPBearer, OAuth2PasswordBearer
 
@@ -15,9 +16,24 @@ class DatabaseSettings(BaseSettings):
     DB_HOST: str
     DB_PORT: int
     DB_NAME: str
+    DB_REPLICA_HOSTS: list[str] = []
 
     echo: bool = True
 
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+    statement_cache_size: int = 100
+    prepared_statement_cache_size: int = 100
+    pgbouncer_mode: bool = False
+
+    replica_strategy: Literal["round_robin", "least_connections"] = (
+        "round_robin"
+    )
+    read_your_writes_seconds: float = 5.0
+
     @property
     def url(self) -> str:
         return (
@@ -25,6 +41,18 @@ class DatabaseSettings(BaseSettings):
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
 
+    @property
+    def replica_urls(self) -> list[str]:
+        """
+        Urls of read replicas from `DB_REPLICA_HOSTS`
+        (JSON list of `host:port`).
+        """
+        return [
+            f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}"
+            f"@{host}/{self.DB_NAME}"
+            for host in self.DB_REPLICA_HOSTS
+        ]
+
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 
@@ -33,6 +61,8 @@ class RedisSettings(BaseSettings):
     REDIS_PORT: int
     REDIS_DB: int
 
+    user_cache_ttl_seconds: int = 300
+
     @property
     def url(self) -> str:
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
@@ -59,13 +89,36 @@ class JWTSettings(BaseModel):
     private_key: Path = BASE_DIR / "certs" / "jwt-private.pem"
     public_key: Path = BASE_DIR / "certs" / "jwt-public.pem"
 
-    algorithm: str = "RS256"
+    algorithm: Literal["RS256", "ES256", "EdDSA"] = "RS256"
+    key_id: str = "1"
+    previous_public_keys: dict[str, Path] = {}
     access_token_expire_minutes: int = 60
     refresh_token_expire_days: int = 30
+    refresh_token_purge_interval_minutes: int = 60
+    refresh_token_purge_batch_size: int = 1000
 
     reset_password_expire_minutes: int = 10
     verification_expire_minutes: int = 10
 
+    verified_token_cache_size: int = 10_000
+    principal_cache_size: int = 0
+    principal_cache_ttl_seconds: int = 5
+
+    revocation_filter_capacity: int = 100_000
+    revocation_filter_error_rate: float = 0.001
+    revocation_sync_seconds: float = 1.0
+
+
+class PasswordSettings(BaseModel):
+    hasher: Literal["scrypt", "pbkdf2_sha256"] = "scrypt"
+    scrypt_n: int = 2 ** 14
+    scrypt_r: int = 8
+    scrypt_p: int = 1
+    pbkdf2_iterations: int = 600_000
+
+    max_workers: int = 4
+    max_pending: int = 64
+
 
 class AuthSettings(BaseSettings):
     HASH_SALT: str
@@ -76,6 +129,7 @@ class AuthSettings(BaseSettings):
     )
 
     jwt: JWTSettings = JWTSettings()
+    password: PasswordSettings = PasswordSettings()
 
     @property
     def salt(self) -> str:
@@ -84,10 +138,65 @@ class AuthSettings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 
+class PaginationSettings(BaseModel):
+    default_limit: int = 20
+    max_limit: int = 100
+    post_comments_preview: int = 3
+
+
+class QueryStatsSettings(BaseModel):
+    enabled: bool = True
+    n_plus_one_threshold: int = 5
+    strict_budget: bool = False
+
+
+class RateLimitRule(BaseModel):
+    """
+    Token bucket of `capacity` requests,
+    fully refilled in `per_seconds`.
+    """
+    capacity: int
+    per_seconds: float
+    by: Literal["ip", "user"] = "ip"
+
+
+class RateLimitSettings(BaseModel):
+    enabled: bool = True
+    fallback_max_keys: int = 10_000
+    rules: dict[str, RateLimitRule] = {
+        "login": RateLimitRule(capacity=5, per_seconds=60),
+        "signup": RateLimitRule(capacity=5, per_seconds=3600),
+        "forgot_password": RateLimitRule(capacity=3, per_seconds=900),
+        "verification": RateLimitRule(capacity=3, per_seconds=900, by="user"),
+        "write": RateLimitRule(capacity=30, per_seconds=60, by="user"),
+    }
+
+
+class FeedSettings(BaseModel):
+    max_length: int = 1000
+    fan_out_max_followers: int = 10_000
+    fan_out_batch_size: int = 1000
+    backfill_posts: int = 50
+
+
+class CountersSettings(BaseModel):
+    reconcile_interval_minutes: int = 24 * 60
+    reconcile_batch_size: int = 1000
+
+
+class ResponseCacheSettings(BaseModel):
+    enabled: bool = True
+    ttl_seconds: int = 60
+    lock_ttl_ms: int = 5000
+    lock_wait_ms: int = 2000
+    lock_poll_ms: int = 50
+
+
 class AppSettings(BaseModel):
     host: str = "127.0.0.1"
     port: int = 8000
     reload: bool = True
+    metrics_enabled: bool = True
 
     @property
     def domain(self) -> str:
@@ -96,6 +205,12 @@ class AppSettings(BaseModel):
 
 class Settings(BaseSettings):
     app: AppSettings = AppSettings()
+    pagination: PaginationSettings = PaginationSettings()
+    query_stats: QueryStatsSettings = QueryStatsSettings()
+    rate_limit: RateLimitSettings = RateLimitSettings()
+    feed: FeedSettings = FeedSettings()
+    counters: CountersSettings = CountersSettings()
+    response_cache: ResponseCacheSettings = ResponseCacheSettings()
     auth: AuthSettings = AuthSettings()
     db: DatabaseSettings = DatabaseSettings()
     redis: RedisSettings = RedisSettings()
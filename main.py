@@ -1,12 +1,18 @@
 import uvicorn
 from fastapi import FastAPI
+from prometheus_client import make_asgi_app
 
 from api import api_router
+from core.query_stats import QueryStatsMiddleware
 from core.settings import settings
 
 
 app = FastAPI()
 app.include_router(api_router)
+if settings.query_stats.enabled:
+    app.add_middleware(QueryStatsMiddleware)
+if settings.app.metrics_enabled:
+    app.mount("/metrics", make_asgi_app())
 
 
 if __name__ == "__main__":